@@ -0,0 +1,24 @@
+# src/app/_auth.py
+from __future__ import annotations
+
+import os
+import hmac
+from typing import Optional
+
+from fastapi import HTTPException
+
+# Resolved once at import; the token only changes with a redeploy.
+_EXPECTED_TOKEN = (os.getenv("CRON_TOKEN") or "").encode()
+
+
+def require_cron_token(x_cron_token: Optional[str], allow_unset: bool = False) -> None:
+    """
+    Check the X-Cron-Token header against CRON_TOKEN in constant time.
+    With allow_unset=True a missing CRON_TOKEN lets every call through (local/dev).
+    """
+    if not _EXPECTED_TOKEN:
+        if allow_unset:
+            return
+        raise HTTPException(status_code=500, detail="CRON_TOKEN not set")
+    if not x_cron_token or not hmac.compare_digest(x_cron_token.encode(), _EXPECTED_TOKEN):
+        raise HTTPException(status_code=401, detail="unauthorized")
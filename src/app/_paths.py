@@ -0,0 +1,10 @@
+# src/app/_paths.py
+"""Data locations shared by the live and admin routers (relative to the working dir)."""
+import os
+
+RAW_DIR = "data/raw"
+PROC_DIR = "data/processed"
+FULLGAME_RAW_PATH = os.path.join(RAW_DIR, "odds_latest.csv")
+FIRSTHALF_RAW_PATH = os.path.join(RAW_DIR, "odds_periods_latest.csv")
+FULLGAME_PATH = os.path.join(PROC_DIR, "market_baselines_h2h.csv")
+FIRSTHALF_PATH = os.path.join(PROC_DIR, "market_baselines_firsthalf.csv")
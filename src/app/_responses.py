@@ -0,0 +1,20 @@
+# src/app/_responses.py
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded by orjson (C, handles numpy scalars and datetimes natively).
+    Defined here rather than imported from fastapi.responses, where it is deprecated
+    in newer releases.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -0,0 +1,60 @@
+# src/app/_runner.py
+"""
+Runs a repo module's `main(argv)` inside a worker process and captures its output.
+
+Lives outside admin.py so pool workers only import this (and the target module),
+not FastAPI and the routers.
+"""
+from __future__ import annotations
+
+import io
+import importlib
+import traceback
+from collections import deque
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Any, Dict, Sequence
+
+TAIL_LINES = 64
+_MAX_PARTIAL = 4000
+
+
+class TailBuffer(io.TextIOBase):
+    """Write-only text sink that keeps only the last `max_lines` lines."""
+
+    def __init__(self, max_lines: int = TAIL_LINES):
+        self._lines: deque = deque(maxlen=max_lines)
+        self._partial = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        *done, partial = (self._partial + s).split("\n")
+        self._lines.extend(line + "\n" for line in done[-self._lines.maxlen:])
+        # A child that never prints a newline (progress bars) must not grow this unbounded.
+        self._partial = partial[-_MAX_PARTIAL:]
+        return len(s)
+
+    def getvalue(self) -> str:
+        return "".join(self._lines) + self._partial
+
+
+def run_module_main(module_str: str, args: Sequence[str]) -> Dict[str, Any]:
+    out, err = TailBuffer(), TailBuffer()
+    returncode = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            importlib.import_module(module_str).main(list(args))
+        except SystemExit as e:
+            code = e.code
+            returncode = code if isinstance(code, int) else (0 if code is None else 1)
+            if code is not None and not isinstance(code, int):
+                print(code, file=err)
+        except BaseException:
+            returncode = 1
+            traceback.print_exc(file=err)
+    return {
+        "returncode": returncode,
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+    }
@@ -3,32 +3,253 @@ from __future__ import annotations
 
 import os
 import sys
-import subprocess
-from typing import List, Dict, Any, Optional
+import time
+import uuid
+import codecs
+import heapq
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import List, Dict, Any, AsyncIterator, Iterable, Iterator, Literal, Optional, Sequence, Set, Tuple
 
+import orjson
+from anyio import CapacityLimiter, to_thread
 from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 
-admin_router = APIRouter()
+from ._auth import require_cron_token
+from ._paths import (
+    FIRSTHALF_PATH, FIRSTHALF_RAW_PATH, FULLGAME_PATH, FULLGAME_RAW_PATH, PROC_DIR, RAW_DIR,
+)
+from ._responses import ORJSONResponse
+from ._runner import TailBuffer, run_module_main
+from .live import warm_baselines
+
+admin_router = APIRouter(default_response_class=ORJSONResponse)
 
 # --------------------- Auth helper ---------------------
 def _require_token(x_cron_token: Optional[str]):
-    want = os.getenv("CRON_TOKEN", "")
-    if not want:
-        # allow local/dev when not set
-        return
-    if x_cron_token != want:
-        raise HTTPException(status_code=401, detail="unauthorized")
+    # allow local/dev when CRON_TOKEN is not set
+    require_cron_token(x_cron_token, allow_unset=True)
 
 # ----------------- Subprocess helpers ------------------
-def _run_py_module(module_str: str, args: List[str]) -> Dict[str, Any]:
-    cmd = [sys.executable, "-m", module_str, *args]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    return {
-        "cmd": " ".join(cmd),
-        "returncode": proc.returncode,
-        "stdout": proc.stdout,
-        "stderr": proc.stderr,
-    }
+# Pipeline modules run their main(argv) in persistent process pools so pandas & co.
+# are imported once per worker instead of once per step. Network-bound pulls and
+# CPU-bound builders get separate pools, so a slow crawl never queues a build and each
+# worker keeps only its own module graph warm. Pool sizes: ADMIN_PULL_WORKERS for pulls
+# (default ADMIN_PULL_CONCURRENCY, itself default 4) and ADMIN_POOL_WORKERS for builders
+# (default 1). ADMIN_RUN_MODE=subprocess falls back to a fresh `python -m` child per step.
+_RUN_MODE = os.getenv("ADMIN_RUN_MODE", "pool")
+_POOLS: Dict[str, ProcessPoolExecutor] = {}
+_PY_PREFIX = (sys.executable, "-m")
+# Bound concurrent pandas/Arrow work so parallel requests can't each hold a full
+# frame in RAM on a small dyno: builders/merges one at a time, peeks two at a time.
+_BUILD_LIMITER = CapacityLimiter(1)
+_PEEK_LIMITER = CapacityLimiter(2)
+_ECHO_CMD = bool(os.getenv("ADMIN_ECHO_CMD"))
+
+def _pool_workers(kind: str) -> int:
+    if kind == "pull":
+        return int(os.getenv("ADMIN_PULL_WORKERS", str(_PULL_CONCURRENCY)))
+    # Builders are serialised by _BUILD_LIMITER, so more than one worker would sit idle.
+    return int(os.getenv("ADMIN_POOL_WORKERS", "1"))
+
+def _get_pool(kind: str) -> ProcessPoolExecutor:
+    pool = _POOLS.get(kind)
+    if pool is None:
+        # Workers are spawned on demand, so an idle pool costs nothing.
+        pool = _POOLS[kind] = ProcessPoolExecutor(
+            max_workers=max(1, _pool_workers(kind)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return pool
+
+def _discard_pool(kind: str, pool: ProcessPoolExecutor) -> None:
+    # A worker that died (OOM kill, segfault) breaks its whole pool for good; drop it
+    # so the next _get_pool starts fresh. Only pop our own pool, not a newer one.
+    if _POOLS.get(kind) is pool:
+        del _POOLS[kind]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# perf: never poll for completion (no `while proc.poll() is None` / sleep loops, no
+# psutil). Await proc.wait() / the executor future so the kernel wakes us on exit.
+async def _run_py_module(
+    module_str: str, args: Sequence[str], pool: str = "build"
+) -> Dict[str, Any]:
+    if _RUN_MODE == "subprocess":
+        return await _run_py_module_subprocess(module_str, args)
+    loop = asyncio.get_running_loop()
+    for _ in range(2):  # retry once on a fresh pool if a worker died under us
+        executor = _get_pool(pool)
+        try:
+            res = await loop.run_in_executor(executor, run_module_main, module_str, args)
+            break
+        except BrokenProcessPool as e:
+            _discard_pool(pool, executor)
+            res = {"returncode": -1, "stdout": "", "stderr": f"worker process died: {e!r}"}
+    return _with_cmd(res, (module_str, *args))
+
+def _with_cmd(res: Dict[str, Any], cmd: Tuple[str, ...]) -> Dict[str, Any]:
+    # The joined command line is only worth building when someone will read it.
+    if _ECHO_CMD or res["returncode"] != 0:
+        res["cmd"] = " ".join(cmd)
+    return res
+
+async def _read_tail(stream: asyncio.StreamReader, tail: TailBuffer) -> None:
+    # Chunked reads (not readline) so one huge line can't trip the StreamReader limit.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        tail.write(decoder.decode(chunk))
+    tail.write(decoder.decode(b"", final=True))
+
+async def _run_py_module_subprocess(module_str: str, args: Sequence[str]) -> Dict[str, Any]:
+    # Async so the pipeline doesn't hold the worker while the child runs. Output is
+    # drained into bounded tails as it arrives, so a chatty child costs O(1) memory.
+    cmd = (*_PY_PREFIX, module_str, *args)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    tail_out, tail_err = TailBuffer(), TailBuffer()
+    await asyncio.gather(_read_tail(proc.stdout, tail_out), _read_tail(proc.stderr, tail_err))
+    await proc.wait()
+    return _with_cmd(
+        {
+            "returncode": proc.returncode,
+            "stdout": tail_out.getvalue(),
+            "stderr": tail_err.getvalue(),
+        },
+        cmd,
+    )
+
+async def _run_py_modules_bounded(
+    module_str: str, arg_lists: List[List[str]], concurrency: int
+) -> List[Dict[str, Any]]:
+    """Run one child per arg list, at most `concurrency` at a time."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(args: List[str]) -> Dict[str, Any]:
+        async with sem:
+            return await _run_py_module(module_str, args, pool="pull")
+
+    results = await asyncio.gather(*(_one(a) for a in arg_lists), return_exceptions=True)
+    steps: List[Dict[str, Any]] = []
+    for args, res in zip(arg_lists, results):
+        if isinstance(res, BaseException):
+            res = {
+                "cmd": " ".join([module_str, *args]),
+                "returncode": -1,
+                "stdout": "",
+                "stderr": repr(res),
+            }
+        steps.append(res)
+    return steps
+
+def _merge_csv_parts(parts: List[str], out_path: str) -> int:
+    """
+    Concatenate per-sport pull outputs into the single file the builders read.
+    A sport with no games writes an empty part, which is skipped; a missing or
+    unreadable part raises OSError before `out_path` is touched.
+    """
+    import pandas as pd
+
+    frames = []
+    error: Optional[OSError] = None
+    for part in parts:
+        try:
+            if os.path.getsize(part) > 1:
+                frames.append(pd.read_csv(part))
+        except pd.errors.EmptyDataError:
+            pass
+        except OSError as e:
+            error = error or e
+        finally:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+    if error is not None:
+        raise error
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    df.to_csv(out_path, index=False)
+    return len(df)
+
+async def _pull_per_sport(
+    module_str: str, sports: Sequence[str], common_args: Sequence[str], out_path: str, tag: str
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Fan a pull module out to one child per sport (bounded by ADMIN_PULL_CONCURRENCY).
+    Each child writes its own part file (suffixed with `tag`, the job id, so two jobs
+    can never share one); they are merged into `out_path` only once every pull
+    succeeded. Returns (pull_results, merge_step or None on failure).
+    """
+    root, ext = os.path.splitext(out_path)
+    parts = [f"{root}__{sk}__{tag}{ext}" for sk in sports]
+    arg_lists = [["--sports", sk, *common_args, "--out", part] for sk, part in zip(sports, parts)]
+    pulls = await _run_py_modules_bounded(module_str, arg_lists, _PULL_CONCURRENCY)
+    if any(r["returncode"] != 0 for r in pulls):
+        for part in parts:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+        return pulls, None
+
+    try:
+        rows = await to_thread.run_sync(_merge_csv_parts, parts, out_path, limiter=_BUILD_LIMITER)
+    except OSError as e:
+        return [*pulls, {"step": "merge", "out": out_path, "returncode": -1, "stderr": repr(e)}], None
+    return pulls, {"step": "merge", "out": out_path, "rows": rows, "returncode": 0}
+
+def _walk(root: str, with_mtime: bool = False, keep: int = 0) -> Tuple[int, List[List[Any]]]:
+    """
+    Iterative os.scandir DFS returning (file count, one file list per directory).
+    Plain paths come back sorted per directory so callers can heapq.merge them instead
+    of sorting the whole tree; with_mtime=True yields (mtime_ns, path) pairs instead.
+    keep > 0 trims each directory's list to its first `keep` names (or `keep` newest),
+    which is all a caller capped at `keep` overall can ever use.
+    """
+    # perf: on Linux getdents() hands back d_type, so this walk issues no stat/statx
+    # at all (only on filesystems reporting DT_UNKNOWN does is_file() fall back to
+    # lstat). Batching statx through io_uring would add syscalls here, not remove them.
+    count = 0
+    per_dir: List[List[Any]] = []
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        files: List[Any] = []
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                elif e.is_file(follow_symlinks=False):
+                    if with_mtime:
+                        try:
+                            files.append((e.stat(follow_symlinks=False).st_mtime_ns, e.path))
+                        except OSError:
+                            continue
+                    else:
+                        files.append(e.path)
+        if not files:
+            continue
+        count += len(files)
+        if 0 < keep < len(files):
+            files = heapq.nlargest(keep, files) if with_mtime else heapq.nsmallest(keep, files)
+        elif not with_mtime:
+            files.sort()
+        per_dir.append(files)
+    return count, per_dir
 
 def _sanitize_markets(env_val: str) -> str:
     # Remove blanks & trailing commas. Only allow known keys.
@@ -47,30 +268,73 @@ def which_builder(x_cron_token: Optional[str] = Header(None)):
         "firsthalf_builder": "src.features.make_baseline_first_half_v2",
     }
 
+_LIST_BUCKETS = {
+    "raw": (RAW_DIR,),
+    "processed": (PROC_DIR,),
+    "model_artifacts": ("models", "model_artifacts"),
+}
+
+def _list_bucket(roots: Sequence[str], limit: int, sort: str) -> Tuple[int, Iterable[str]]:
+    """(total file count, up to `limit` paths in `sort` order) for one bucket."""
+    count = 0
+    per_dir: List[List[Any]] = []
+    for root in roots:
+        n, dirs = _walk(root, with_mtime=sort == "mtime", keep=limit)
+        count += n
+        per_dir.extend(dirs)
+    if sort == "mtime":
+        entries = [e for files in per_dir for e in files]
+        top = heapq.nlargest(limit, entries) if limit > 0 else sorted(entries, reverse=True)
+        return count, (p for _, p in top)
+    merged = heapq.merge(*per_dir)
+    return count, (islice(merged, limit) if limit > 0 else merged)
+
+def _ndjson(records: Iterable[Any]) -> Iterator[bytes]:
+    for rec in records:
+        yield orjson.dumps(rec, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
 @admin_router.get("/admin/list_files")
-def list_files(x_cron_token: Optional[str] = Header(None)):
+def list_files(
+    limit: int = 200,
+    sort: Literal["name", "mtime"] = "mtime",
+    format: Literal["json", "ndjson"] = "json",
+    x_cron_token: Optional[str] = Header(None),
+):
+    """
+    Per-bucket file listing. Returns at most `limit` paths per bucket (newest first
+    for sort=mtime, lexicographic for sort=name) plus the full count; limit=0 lists all.
+    format=ndjson streams one {"bucket","path"} line per file, then a {"bucket","count"}
+    line per bucket, without building the whole listing first.
+    """
     _require_token(x_cron_token)
-    paths = {"raw": [], "processed": [], "model_artifacts": []}
-    for p in ("data/raw", "data/processed", "models", "model_artifacts"):
-        if os.path.isdir(p):
-            for root, _, files in os.walk(p):
-                for f in files:
-                    rel = os.path.join(root, f)
-                    if rel.startswith("data/raw"):
-                        paths["raw"].append(rel)
-                    elif rel.startswith("data/processed"):
-                        paths["processed"].append(rel)
-                    elif rel.startswith(("models", "model_artifacts")):
-                        paths["model_artifacts"].append(rel)
-    return {"ok": True, "files": paths}
+
+    if format == "ndjson":
+        def _records() -> Iterator[Dict[str, Any]]:
+            for bucket, roots in _LIST_BUCKETS.items():
+                count, files = _list_bucket(roots, limit, sort)
+                for path in files:
+                    yield {"bucket": bucket, "path": path}
+                yield {"bucket": bucket, "count": count}
+
+        return StreamingResponse(_ndjson(_records()), media_type="application/x-ndjson")
+
+    paths = {}
+    counts = {}
+    for bucket, roots in _LIST_BUCKETS.items():
+        counts[bucket], files = _list_bucket(roots, limit, sort)
+        paths[bucket] = list(files)
+    # Returned as a response object so FastAPI skips jsonable_encoder on the big list.
+    return ORJSONResponse(
+        {"ok": True, "files": paths, "counts": counts, "limit": limit, "sort": sort}
+    )
 
 @admin_router.get("/admin/debug_paths")
 def debug_paths(x_cron_token: Optional[str] = Header(None)):
     _require_token(x_cron_token)
-    raw_dir = "data/raw"
-    processed_dir = "data/processed"
-    fullgame_path = os.path.join(processed_dir, "market_baselines_h2h.csv")
-    firsthalf_path = os.path.join(processed_dir, "market_baselines_firsthalf.csv")
+    raw_dir = RAW_DIR
+    processed_dir = PROC_DIR
+    fullgame_path = FULLGAME_PATH
+    firsthalf_path = FIRSTHALF_PATH
 
     def _size(p: str) -> int:
         try:
@@ -108,94 +372,264 @@ def debug_paths(x_cron_token: Optional[str] = Header(None)):
                 "fullgame_size": _size(fullgame_path),
                 "firsthalf_size": _size(firsthalf_path),
             },
-            "time": int(__import__("time").time()),
+            "time": int(time.time()),
         },
     }
 
 # ------------------- Build pipelines -------------------
-@admin_router.post("/admin/refresh_fullgame_safe")
-def refresh_fullgame_safe(x_cron_token: Optional[str] = Header(None)):
-    _require_token(x_cron_token)
+FULLGAME_SPORTS = (
+    "baseball_mlb",
+    "basketball_nba",
+    "americanfootball_nfl",
+    "americanfootball_ncaaf",
+    "icehockey_nhl",
+)
+FIRSTHALF_SPORTS = (
+    "baseball_mlb",
+    "basketball_nba",
+    "americanfootball_nfl",
+    "americanfootball_ncaaf",
+)
 
-    odds_api_markets = _sanitize_markets(os.getenv("ODDS_API_MARKETS", "h2h,spreads,totals"))
-    if not odds_api_markets:
-        odds_api_markets = "h2h"
-
-    args_pull = [
-        "--sports",
-        "baseball_mlb",
-        "basketball_nba",
-        "americanfootball_nfl",
-        "americanfootball_ncaaf",
-        "icehockey_nhl",
-        "--regions",
-        os.getenv("ODDS_API_REGIONS", "us,eu"),
-        "--markets",
-        odds_api_markets,
-    ]
-    step1 = _run_py_module("src.etl.pull_odds_to_csv", args_pull)
-    if step1["returncode"] != 0:
-        return {"ok": False, "step": "pull", **step1}
-
-    step2 = _run_py_module("src.features.make_baseline_from_odds_v2", [])
-    if step2["returncode"] != 0:
-        return {"ok": False, "step": "baseline", **step2}
-
-    return {"ok": True, "steps": [step1, step2]}
-
-@admin_router.post("/admin/refresh_firsthalf")
-def refresh_firsthalf(x_cron_token: Optional[str] = Header(None)):
-    _require_token(x_cron_token)
+def _load_pull_config() -> Dict[str, Any]:
+    """Resolve the env-derived pull args once; /admin/reload_config re-runs this."""
+    global _FULLGAME_PULL_ARGS, _FIRSTHALF_PULL_ARGS, _PULL_CONCURRENCY
+    regions = os.getenv("ODDS_API_REGIONS", "us,eu")
+    markets = _sanitize_markets(os.getenv("ODDS_API_MARKETS", "h2h,spreads,totals")) or "h2h"
+    _FULLGAME_PULL_ARGS = ("--regions", regions, "--markets", markets)
+    _FIRSTHALF_PULL_ARGS = ("--regions", regions)
+    _PULL_CONCURRENCY = int(os.getenv("ADMIN_PULL_CONCURRENCY", "4"))
+    return {
+        "fullgame_pull_args": list(_FULLGAME_PULL_ARGS),
+        "firsthalf_pull_args": list(_FIRSTHALF_PULL_ARGS),
+        "pull_concurrency": _PULL_CONCURRENCY,
+    }
 
-    args_pull = [
-        "--sports",
-        "baseball_mlb",
-        "basketball_nba",
-        "americanfootball_nfl",
-        "americanfootball_ncaaf",
-        "--regions",
-        os.getenv("ODDS_API_REGIONS", "us,eu"),
-    ]
-    step1 = _run_py_module("src.etl.pull_period_odds_to_csv", args_pull)
-    if step1["returncode"] != 0:
-        return {"ok": False, "step": "pull", **step1}
-
-    step2 = _run_py_module("src.features.make_baseline_first_half_v2", [])
-    if step2["returncode"] != 0:
-        return {"ok": False, "step": "baseline", **step2}
-
-    return {"ok": True, "steps": [step1, step2]}
+_FULLGAME_PULL_ARGS: Tuple[str, ...] = ()
+_FIRSTHALF_PULL_ARGS: Tuple[str, ...] = ()
+_PULL_CONCURRENCY = 4
+_load_pull_config()
 
-# -------- NEW: peek into first-half CSV to diagnose filters --------
-@admin_router.get("/admin/peek_firsthalf_sample")
-def peek_firsthalf_sample(limit: int = 10, x_cron_token: Optional[str] = Header(None)):
-    _require_token(x_cron_token)
-    import pandas as pd
+# One run per pipeline kind at a time: both runs would write the same raw and
+# baseline files. Job coalescing already prevents this; the lock makes it a guarantee.
+_PIPELINE_LOCKS = {"fullgame": asyncio.Lock(), "firsthalf": asyncio.Lock()}
 
-    path = "data/processed/market_baselines_firsthalf.csv"
-    if not os.path.exists(path):
-        return {"ok": False, "exists": False, "note": "missing file"}
+async def _pipeline_fullgame(tag: str) -> Dict[str, Any]:
+    async with _PIPELINE_LOCKS["fullgame"]:
+        pulls, step1 = await _pull_per_sport(
+            "src.etl.pull_odds_to_csv", FULLGAME_SPORTS, _FULLGAME_PULL_ARGS, FULLGAME_RAW_PATH, tag
+        )
+        if step1 is None:
+            return {"ok": False, "step": "pull", "steps": pulls}
+
+        async with _BUILD_LIMITER:
+            step2 = await _run_py_module("src.features.make_baseline_from_odds_v2", [])
+        if step2["returncode"] != 0:
+            return {"ok": False, "step": "baseline", **step2}
+        await to_thread.run_sync(warm_baselines, (FULLGAME_PATH,), limiter=_PEEK_LIMITER)
+
+    return {"ok": True, "steps": [*pulls, step1, step2]}
+
+async def _pipeline_firsthalf(tag: str) -> Dict[str, Any]:
+    async with _PIPELINE_LOCKS["firsthalf"]:
+        pulls, step1 = await _pull_per_sport(
+            "src.etl.pull_period_odds_to_csv", FIRSTHALF_SPORTS, _FIRSTHALF_PULL_ARGS, FIRSTHALF_RAW_PATH, tag
+        )
+        if step1 is None:
+            return {"ok": False, "step": "pull", "steps": pulls}
+
+        async with _BUILD_LIMITER:
+            step2 = await _run_py_module("src.features.make_baseline_first_half_v2", [])
+        if step2["returncode"] != 0:
+            return {"ok": False, "step": "baseline", **step2}
+        await to_thread.run_sync(warm_baselines, (FIRSTHALF_PATH,), limiter=_PEEK_LIMITER)
+
+    return {"ok": True, "steps": [*pulls, step1, step2]}
+
+async def _join_or_run(kind: str, tag: str) -> Dict[str, Any]:
+    # A single-pipeline job already in flight is joined (its result reported) rather
+    # than started a second time next to it.
+    running_id = _RUNNING.get(kind)
+    task = _RUNNING_TASKS.get(kind)
+    if running_id is not None and task is not None:
+        job = JOBS[running_id]
+        await asyncio.shield(task)  # cancelling "all" must not cancel the joined job
+        return {**job.get("result", {"ok": False}), "joined_job_id": running_id}
+    return await _PIPELINES[kind](tag)
 
+async def _pipeline_all(tag: str) -> Dict[str, Any]:
+    # The two pulls are independent network-bound crawls, so they overlap; the builders
+    # still run one at a time because both take _BUILD_LIMITER.
+    fullgame, firsthalf = await asyncio.gather(
+        _join_or_run("fullgame", tag), _join_or_run("firsthalf", tag)
+    )
+    return {
+        "ok": bool(fullgame.get("ok") and firsthalf.get("ok")),
+        "fullgame": fullgame,
+        "firsthalf": firsthalf,
+    }
+
+_PIPELINES = {
+    "fullgame": _pipeline_fullgame,
+    "firsthalf": _pipeline_firsthalf,
+    "all": _pipeline_all,
+}
+
+# ---------------------- Job registry --------------------
+# In-memory only: jobs are per-process and vanish on restart.
+JOBS: Dict[str, Dict[str, Any]] = {}
+_MAX_JOBS = 100
+_JOB_TASKS: Set[asyncio.Task] = set()  # keep strong refs so tasks aren't GC'd mid-run
+# kind -> id of its in-flight job. A second trigger while one is running (overlapping
+# cron fires) joins that job instead of pulling the Odds API again. A running "all"
+# covers the single-pipeline kinds too, and "all" joins running single-pipeline jobs
+# (see _join_or_run). No lock needed: _start_job never awaits, so check-and-register
+# is atomic on the event loop.
+_RUNNING: Dict[str, str] = {}
+_RUNNING_TASKS: Dict[str, asyncio.Task] = {}
+_COVERED_BY = {
+    "fullgame": ("fullgame", "all"),
+    "firsthalf": ("firsthalf", "all"),
+    "all": ("all",),
+}
+# kind -> (monotonic finish time, job id) of its last successful run. A trigger landing
+# within ADMIN_REFRESH_DEDUP_SECONDS of that (cron retries, a deploy's burst of workers)
+# gets the finished job back instead of spending Odds-API quota on identical data.
+_REFRESH_DEDUP_SECONDS = float(os.getenv("ADMIN_REFRESH_DEDUP_SECONDS", "30") or 0)
+_LAST_OK: Dict[str, Tuple[float, str]] = {}
+
+async def _run_refresh(job_id: str, kind: str) -> None:
+    job = JOBS[job_id]
     try:
-        df = pd.read_csv(path)
+        result = await _PIPELINES[kind](job_id)
     except Exception as e:
-        return {"ok": False, "exists": True, "note": f"read failed: {e}"}
+        job.update(state="failed", finished_at=int(time.time()), result={"ok": False, "error": repr(e)})
+        return
+    finally:
+        _RUNNING.pop(kind, None)
+        _RUNNING_TASKS.pop(kind, None)
+    job.update(
+        state="done" if result.get("ok") else "failed",
+        finished_at=int(time.time()),
+        result=result,
+    )
+    if result.get("ok"):
+        _LAST_OK[kind] = (time.monotonic(), job_id)
+
+def _start_job(kind: str) -> ORJSONResponse:
+    for k in _COVERED_BY[kind]:
+        running_id = _RUNNING.get(k)
+        if running_id is not None:
+            return ORJSONResponse(
+                {"ok": True, "job_id": running_id, "kind": k, "coalesced": True}, status_code=202
+            )
+    now = time.monotonic()
+    for k in _COVERED_BY[kind]:
+        last = _LAST_OK.get(k)
+        if last is not None and now - last[0] < _REFRESH_DEDUP_SECONDS and last[1] in JOBS:
+            return ORJSONResponse(
+                {"ok": True, "job_id": last[1], "kind": k, "recent": True}, status_code=202
+            )
+
+    # Drop the oldest finished jobs once the registry is full (dicts keep insertion order).
+    for old_id in [k for k, j in JOBS.items() if j["state"] != "running"][: max(0, len(JOBS) - _MAX_JOBS + 1)]:
+        JOBS.pop(old_id, None)
+
+    job_id = uuid.uuid4().hex
+    JOBS[job_id] = {"id": job_id, "kind": kind, "state": "running", "started_at": int(time.time())}
+    _RUNNING[kind] = job_id
+    task = _RUNNING_TASKS[kind] = asyncio.create_task(_run_refresh(job_id, kind))
+    _JOB_TASKS.add(task)
+    task.add_done_callback(_JOB_TASKS.discard)
+    return ORJSONResponse({"ok": True, "job_id": job_id, "kind": kind}, status_code=202)
+
+@admin_router.post("/admin/refresh_fullgame_safe", status_code=202)
+async def refresh_fullgame_safe(x_cron_token: Optional[str] = Header(None)):
+    _require_token(x_cron_token)
+    return _start_job("fullgame")
 
-    n = len(df)
-    cols = list(df.columns)
+@admin_router.post("/admin/refresh_firsthalf", status_code=202)
+async def refresh_firsthalf(x_cron_token: Optional[str] = Header(None)):
+    _require_token(x_cron_token)
+    return _start_job("firsthalf")
+
+@admin_router.post("/admin/refresh_all", status_code=202)
+async def refresh_all(x_cron_token: Optional[str] = Header(None)):
+    _require_token(x_cron_token)
+    return _start_job("all")
+
+@admin_router.get("/admin/job/{job_id}")
+def job_status(job_id: str, x_cron_token: Optional[str] = Header(None)):
+    _require_token(x_cron_token)
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return {"ok": True, "job": job}
+
+@admin_router.post("/admin/reload_config")
+def reload_config(x_cron_token: Optional[str] = Header(None)):
+    _require_token(x_cron_token)
+    return {"ok": True, "config": _load_pull_config()}
+
+# -------- NEW: peek into first-half CSV to diagnose filters --------
+_PEEK_CACHE: Dict[Tuple[int, int, int], Dict[str, Any]] = {}  # single entry
 
-    summary = {}
-    if "sport_key" in df.columns:
-        summary["counts_by_sport_key"] = df["sport_key"].value_counts(dropna=False).to_dict()
+def _peek_csv(path: str, limit: int) -> Dict[str, Any]:
+    """
+    Arrow-based peek: the sample comes from the first streamed block only, and the
+    summary reads just the columns it aggregates instead of parsing the whole CSV.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pc
 
-    if "num_books" in df.columns and n:
-        summary["num_books_min"] = float(df["num_books"].min())
-        summary["num_books_max"] = float(df["num_books"].max())
+    # Keep timestamps as the strings the builders wrote.
+    convert = pacsv.ConvertOptions(
+        column_types={"commence_time": pa.string(), "last_updated_utc": pa.string()}
+    )
+    # One read-only mapping serves both passes; pages stay shared with the page cache.
+    with pa.memory_map(path) as mm:
+        reader = pacsv.open_csv(
+            mm, read_options=pacsv.ReadOptions(block_size=1 << 20), convert_options=convert
+        )
+        cols = reader.schema.names
+        try:
+            first = reader.read_next_batch()
+            sample = first.slice(0, limit).to_pylist()
+        except StopIteration:
+            sample = []
 
-    if "books_used" in df.columns:
-        summary["top_books_used_sets"] = (
-            df["books_used"].fillna("").value_counts().head(10).to_dict()
+        summary_cols = [c for c in ("sport_key", "num_books", "books_used") if c in cols]
+        mm.seek(0)
+        tbl = pacsv.read_csv(
+            mm,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=summary_cols or cols[:1],
+                column_types={"sport_key": pa.string(), "books_used": pa.string()},
+            ),
         )
+    n = tbl.num_rows
+
+    def _counts(arr, top: Optional[int] = None) -> Dict[Any, int]:
+        vc = pc.value_counts(arr)
+        values, counts = vc.field("values"), vc.field("counts")
+        order = pc.sort_indices(counts, sort_keys=[("", "descending")])
+        if top is not None:
+            order = order[:top]
+        return {values[i].as_py(): counts[i].as_py() for i in order.to_pylist()}
+
+    summary: Dict[str, Any] = {}
+    if "sport_key" in summary_cols:
+        summary["counts_by_sport_key"] = _counts(tbl["sport_key"])
+
+    if "num_books" in summary_cols and n:
+        stats = pc.min_max(tbl["num_books"])
+        lo, hi = stats["min"].as_py(), stats["max"].as_py()  # None when the column is all-null
+        summary["num_books_min"] = None if lo is None else float(lo)
+        summary["num_books_max"] = None if hi is None else float(hi)
+
+    if "books_used" in summary_cols:
+        summary["top_books_used_sets"] = _counts(pc.fill_null(tbl["books_used"], ""), top=10)
 
     return {
         "ok": True,
@@ -203,5 +637,81 @@ def peek_firsthalf_sample(limit: int = 10, x_cron_token: Optional[str] = Header(
         "rows": n,
         "columns": cols,
         "summary": summary,
-        "sample": df.head(max(1, min(50, limit))).to_dict(orient="records"),
+        "sample": sample,
     }
+
+def _iter_csv_batches(path: str, limit: int) -> Iterator[List[Dict[str, Any]]]:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    with pa.memory_map(path) as mm:
+        reader = pacsv.open_csv(
+            mm,
+            read_options=pacsv.ReadOptions(block_size=1 << 20),
+            convert_options=pacsv.ConvertOptions(
+                column_types={"commence_time": pa.string(), "last_updated_utc": pa.string()}
+            ),
+        )
+        remaining = limit if limit > 0 else None
+        for batch in reader:
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+            yield batch.to_pylist()
+
+def _next_ndjson_chunk(batches: Iterator[List[Dict[str, Any]]]) -> Optional[bytes]:
+    batch = next(batches, None)
+    return None if batch is None else b"".join(_ndjson(batch))
+
+async def _stream_csv_ndjson(path: str, limit: int) -> AsyncIterator[bytes]:
+    # Hold a peek slot for the whole stream (a slow client keeps the file mapped and a
+    # batch in RAM), and parse each batch off the event loop.
+    async with _PEEK_LIMITER:
+        batches = _iter_csv_batches(path, limit)
+        try:
+            while True:
+                chunk = await to_thread.run_sync(_next_ndjson_chunk, batches)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            batches.close()
+
+@admin_router.get("/admin/peek_firsthalf_sample")
+async def peek_firsthalf_sample(
+    limit: int = 10,
+    format: Literal["json", "ndjson"] = "json",
+    x_cron_token: Optional[str] = Header(None),
+):
+    """
+    Summary + sample of the first-half baseline. format=ndjson instead streams the
+    first `limit` rows (limit<=0: every row) one JSON object per line, batch by batch.
+    """
+    _require_token(x_cron_token)
+
+    path = FIRSTHALF_PATH
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {"ok": False, "exists": False, "note": "missing file"}
+
+    if format == "ndjson":
+        return StreamingResponse(_stream_csv_ndjson(path, limit), media_type="application/x-ndjson")
+
+    limit = max(1, min(50, limit))
+    # The file only changes when refresh_firsthalf rewrites it, which bumps mtime.
+    key = (st.st_mtime_ns, st.st_size, limit)
+    cached = _PEEK_CACHE.get(key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+
+    try:
+        result = await to_thread.run_sync(_peek_csv, path, limit, limiter=_PEEK_LIMITER)
+    except Exception as e:
+        return {"ok": False, "exists": True, "note": f"read failed: {e}"}
+
+    _PEEK_CACHE.clear()
+    _PEEK_CACHE[key] = result
+    return ORJSONResponse(result)
@@ -1,62 +1,208 @@
 # src/app/live.py
 import os
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter, Query, Header, HTTPException
-from fastapi.responses import JSONResponse
+import pyarrow.parquet as pq
+from fastapi import APIRouter, Query, Header
+from fastapi.responses import Response
+
+from ._auth import require_cron_token
+from ._paths import FIRSTHALF_PATH, FULLGAME_PATH
+from ._responses import ORJSONResponse
+from ..features.baseline_store import CATEGORICAL_COLS, add_derived_columns, parquet_path_for
 
 # NOTE: This module only defines a router.
 # DO NOT create a FastAPI() app here and DO NOT import this module from itself.
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+# Resolved once at import; these only change with a redeploy.
+LIVE_MIN_BOOKS = _env_int("LIVE_MIN_BOOKS", 3)
+LIVE_MAX_AGE_MINUTES = _env_int("LIVE_MAX_AGE_MINUTES", 60)
+# /picks_live results are reused for this many seconds (0 disables). The freshness
+# filter is time-dependent, so a cached answer can lag the cutoff by at most this much.
+LIVE_CACHE_TTL_SECONDS = _env_int("LIVE_CACHE_TTL_SECONDS", 15)
 
-RAW_DIR = "data/raw"
-PROC_DIR = "data/processed"
-FULLGAME_PATH = os.path.join(PROC_DIR, "market_baselines_h2h.csv")
-FIRSTHALF_PATH = os.path.join(PROC_DIR, "market_baselines_firsthalf.csv")
-CRON_TOKEN = os.getenv("CRON_TOKEN", "")
+# Per-sport overrides, e.g. LIVE_MAX_AGE_MINUTES__BASKETBALL_NBA=120, snapshotted from the
+# environment like the globals above. Unparseable values fall back to the global cap.
+def _max_age_overrides(prefix: str = "LIVE_MAX_AGE_MINUTES__") -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for k, v in os.environ.items():
+        if k.startswith(prefix):
+            try:
+                out[k[len(prefix):]] = int(v)
+            except ValueError:
+                pass
+    return out
+
+_MAX_AGE_BY_SPORT = _max_age_overrides()
+
+@lru_cache(maxsize=64)
+def _get_max_age_minutes(sk: Optional[str]) -> int:
+    if not sk:
+        return LIVE_MAX_AGE_MINUTES
+    return _MAX_AGE_BY_SPORT.get(str(sk).upper().replace("-", "_"), LIVE_MAX_AGE_MINUTES)
 
 def _need_auth(x_cron_token: Optional[str]) -> None:
-    if not CRON_TOKEN:
-        raise HTTPException(status_code=500, detail="CRON_TOKEN not set")
-    if x_cron_token != CRON_TOKEN:
-        raise HTTPException(status_code=401, detail="unauthorized")
+    require_cron_token(x_cron_token)
+
+# Everything picks_live reads or returns; the loader projects to these up front.
+# edge_home_abs is written by the baseline builders; older files get it derived at load.
+PICK_COLS = (
+    "event_id", "sport_key", "commence_time",
+    "home_team", "away_team",
+    "consensus_home_q", "consensus_away_q",
+    "consensus_home_fair_odds", "consensus_away_fair_odds",
+    "num_books", "books_used", "last_updated_utc", "edge_home_abs",
+)
 
-def _read_csv_or_note(path: str) -> pd.DataFrame:
-    if not os.path.exists(path) or os.path.getsize(path) == 0:
+# Load-time parse of last_updated_utc (naive UTC datetime64); never part of a response.
+_UPDATED_AT = "_updated_at"
+
+def _parse_updated(s: pd.Series) -> pd.Series:
+    # The builders write ISO-8601 stamps; a fixed format skips per-value inference, and
+    # cache=True parses each distinct stamp once (many rows share a pull's timestamp).
+    return pd.to_datetime(s, utc=True, errors="coerce", format="ISO8601", cache=True)
+
+# path -> ((source file, st_mtime_ns, st_size, columns), parsed frame). The baselines are
+# only rewritten by the admin refresh jobs, which changes mtime and so invalidates the entry.
+_BASELINE_CACHE: Dict[str, Tuple[Tuple[Any, ...], pd.DataFrame]] = {}
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def _baseline_source(path: str) -> Optional[Tuple[str, int, int]]:
+    # Prefer the Parquet sibling the builders write, unless the CSV is newer than it.
+    pq_path = parquet_path_for(path)
+    st = _stat_or_none(path)
+    pq_st = _stat_or_none(pq_path)
+    if pq_st is not None and (st is None or pq_st.st_mtime_ns >= st.st_mtime_ns):
+        return (pq_path, pq_st.st_mtime_ns, pq_st.st_size)
+    if st is None or st.st_size == 0:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+def _read_csv_or_note(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    min_books: int = 0,
+) -> pd.DataFrame:
+    # `columns` projects at parse time so unused builder columns never get materialised,
+    # and comes back in that order. `min_books` is a static predicate (it only changes
+    # with a redeploy) pushed into the read, so filtered-out rows are never cached.
+    # Both readers mmap the file, parsing straight out of the page cache with no read() copy.
+    source = _baseline_source(path)
+    if source is None:
         raise FileNotFoundError(f"Missing or empty file: {os.path.basename(path)}")
-    return pd.read_csv(path)
+    src = source[0]
+    pq_path = parquet_path_for(path)
+
+    key = (*source, tuple(columns) if columns is not None else None, min_books)
+    hit = _BASELINE_CACHE.get(path)
+    if hit is None or hit[0] != key:
+        if src == pq_path:
+            present = pq.read_schema(src).names
+            want = None if columns is None else [c for c in columns if c in present]
+            filters = [("num_books", ">=", min_books)] if min_books and "num_books" in present else None
+            df = pd.read_parquet(src, columns=want, filters=filters, memory_map=True)
+        else:
+            usecols = None if columns is None else set(columns).__contains__
+            # Categorical columns are built by the C parser directly (no object pass), so
+            # both paths hand picks_live the same dtypes as the Parquet file's dictionaries.
+            df = pd.read_csv(
+                src,
+                usecols=usecols,
+                dtype={c: "category" for c in CATEGORICAL_COLS},
+                memory_map=True,
+            )
+            if min_books and "num_books" in df.columns:
+                df = df[df["num_books"].to_numpy() >= min_books]
+            if columns is not None:
+                df = df[[c for c in columns if c in df.columns]]
+        if "edge_home_abs" not in df.columns:
+            # Baselines written before the builders persisted it: derive it once here.
+            df = add_derived_columns(df)
+        if "last_updated_utc" in df.columns:
+            # Parsed once per file version; freshness then only does date arithmetic.
+            ts = _parse_updated(df["last_updated_utc"])
+            df[_UPDATED_AT] = ts.to_numpy(dtype="datetime64[ns]")
+        if "edge_home_abs" in df.columns:
+            # Ranked once per file version (edge desc, then commence_time), so picks_live
+            # reads the rows passing its threshold as a prefix, already in output order.
+            # The Parquet copy is written edge-sorted, making this close to a no-op there.
+            keys = [c for c in ("edge_home_abs", "commence_time") if c in df.columns]
+            df = df.sort_values(
+                keys, ascending=[False, True][: len(keys)], kind="stable", na_position="last"
+            ).reset_index(drop=True)
+        hit = (key, df)
+        _BASELINE_CACHE[path] = hit
+    # Shallow copy: callers may add columns without touching the cached frame.
+    return hit[1].copy(deep=False)
 
-def _apply_freshness_filter(df: pd.DataFrame) -> pd.DataFrame:
-    def _get_max_age_minutes(sk: Optional[str]) -> int:
-        if not sk:
-            return int(os.getenv("LIVE_MAX_AGE_MINUTES", "60"))
-        sk_upper = str(sk).upper()
-        per_key = f"LIVE_MAX_AGE_MINUTES__{sk_upper.replace('-', '_')}"
-        return int(os.getenv(per_key, os.getenv("LIVE_MAX_AGE_MINUTES", "60")))
+def _warm_one(path: str) -> None:
+    try:
+        _read_csv_or_note(path, PICK_COLS, min_books=max(1, LIVE_MIN_BOOKS))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[WARN] could not preload {path}: {e}")
 
-    if "last_updated_utc" in df.columns:
+def warm_baselines(paths: Sequence[str] = (FULLGAME_PATH, FIRSTHALF_PATH)) -> None:
+    # Parse baselines into the cache ahead of traffic (startup, right after a rebuild) so
+    # the first /picks_live request is a hit; later requests only pay one stat() each.
+    # The files are independent and the Arrow/C parsers release the GIL, so load them
+    # side by side rather than one after the other.
+    if len(paths) <= 1:
+        for path in paths:
+            _warm_one(path)
+        return
+    with ThreadPoolExecutor(max_workers=len(paths)) as ex:
+        list(ex.map(_warm_one, paths))
+
+def _header(path: str) -> List[str]:
+    try:
+        return list(pd.read_csv(path, nrows=0).columns)
+    except Exception:
+        return []
+
+# True where last_updated_utc is within the (per-sport) max age; all True if unparseable.
+def _freshness_mask(df: pd.DataFrame) -> np.ndarray:
+    keep = np.ones(len(df), dtype=bool)
+    if "last_updated_utc" in df.columns and len(df):
         try:
-            ts = pd.to_datetime(df["last_updated_utc"], utc=True, errors="coerce")
-            now = pd.Timestamp.utcnow()
-            age_min = (now - ts).dt.total_seconds() / 60.0
-            if "sport_key" in df.columns:
-                def _row_keep(row):
-                    try:
-                        cap = _get_max_age_minutes(row.get("sport_key"))
-                    except Exception:
-                        cap = int(os.getenv("LIVE_MAX_AGE_MINUTES", "60"))
-                    return 0 <= row["_age_min"] <= cap
-                tmp = df.copy()
-                tmp["_age_min"] = age_min
-                df = tmp[tmp.apply(_row_keep, axis=1)].drop(columns=["_age_min"])
+            if _UPDATED_AT in df.columns:
+                ts = df[_UPDATED_AT].to_numpy()
             else:
-                max_age = int(os.getenv("LIVE_MAX_AGE_MINUTES", "60"))
-                df = df.loc[(age_min >= 0) & (age_min <= max_age)].copy()
+                ts = _parse_updated(df["last_updated_utc"])
+                ts = ts.to_numpy(dtype="datetime64[ns]")
+            # Plain datetime64 arithmetic; NaT ages come out as NaN and fail both bounds.
+            now = np.datetime64(time.time_ns(), "ns")
+            age_min = (now - ts) / np.timedelta64(1, "m")
+            cap: Any = LIVE_MAX_AGE_MINUTES
+            if "sport_key" in df.columns:
+                # One cap lookup per distinct sport, broadcast back through the codes;
+                # code -1 (missing sport_key) picks the trailing default.
+                codes, sports = pd.factorize(df["sport_key"])
+                caps = [_get_max_age_minutes(sk) for sk in sports]
+                cap = np.array(caps + [LIVE_MAX_AGE_MINUTES])[codes]
+            keep = (age_min >= 0) & (age_min <= cap)
         except Exception:
             pass
-    return df
+    return keep
 
 @router.get("/admin/peek_csv")
 def admin_peek_csv(
@@ -66,7 +212,7 @@ def admin_peek_csv(
     _need_auth(x_cron_token)
     path = FULLGAME_PATH if which == "fullgame" else FIRSTHALF_PATH
     if not os.path.exists(path):
-        return JSONResponse({"ok": False, "error": f"missing {path}"}, status_code=404)
+        return ORJSONResponse({"ok": False, "error": f"missing {path}"}, status_code=404)
     try:
         df = pd.read_csv(path, nrows=200)
         return {
@@ -77,7 +223,7 @@ def admin_peek_csv(
             "sample_rows": df.head(5).to_dict(orient="records"),
         }
     except Exception as e:
-        return JSONResponse({"ok": False, "error": str(e), "path": path}, status_code=500)
+        return ORJSONResponse({"ok": False, "error": str(e), "path": path}, status_code=500)
 
 @router.get("/picks_live")
 def picks_live(
@@ -86,9 +232,31 @@ def picks_live(
     limit: int = 20,
 ):
     path = FIRSTHALF_PATH if source == "firsthalf" else FULLGAME_PATH
+    if LIVE_CACHE_TTL_SECONDS <= 0:
+        body = _render_picks(path, float(min_abs_edge), int(limit))
+    else:
+        # A refresh changes the source key; the time bucket bounds how stale freshness gets.
+        bucket = int(time.time() // LIVE_CACHE_TTL_SECONDS)
+        body = _cached_picks(path, float(min_abs_edge), int(limit), _baseline_source(path), bucket)
+    return Response(content=body, media_type="application/json")
 
+@lru_cache(maxsize=512)
+def _cached_picks(
+    path: str,
+    min_abs_edge: float,
+    limit: int,
+    source_key: Optional[Tuple[str, int, int]],
+    bucket: int,
+) -> bytes:
+    return _render_picks(path, min_abs_edge, limit)
+
+# Payloads are cached already serialized, so a cache hit costs no encoding at all.
+def _render_picks(path: str, min_abs_edge: float, limit: int) -> bytes:
+    return ORJSONResponse(_compute_picks(path, min_abs_edge, limit)).body
+
+def _compute_picks(path: str, min_abs_edge: float, limit: int) -> Dict[str, Any]:
     try:
-        df = _read_csv_or_note(path)
+        df = _read_csv_or_note(path, PICK_COLS, min_books=max(1, LIVE_MIN_BOOKS))
     except FileNotFoundError as e:
         return {"picks": [], "note": str(e)}
 
@@ -98,34 +266,30 @@ def picks_live(
             "picks": [],
             "note": f"{os.path.basename(path)} missing columns: "
                     f"{', '.join(sorted(list(needed.difference(set(df.columns)))))}",
-            "columns_present": list(df.columns),
+            "columns_present": _header(path) or list(df.columns),
         }
 
-    min_books = int(os.getenv("LIVE_MIN_BOOKS", "3"))
-    if "num_books" in df.columns:
-        df = df[df["num_books"] >= max(1, min_books)].copy()
-
-    df = _apply_freshness_filter(df)
-
-    df["edge_home_abs"] = (df["consensus_home_q"] - 0.5).abs()
-    df = df[df["edge_home_abs"] >= float(min_abs_edge)]
-
-    cols_keep = [
-        "event_id", "sport_key", "commence_time",
-        "home_team", "away_team",
-        "consensus_home_q", "consensus_away_q",
-        "consensus_home_fair_odds", "consensus_away_fair_odds",
-        "num_books", "books_used", "last_updated_utc", "edge_home_abs",
-    ]
-    cols_exist = [c for c in cols_keep if c in df.columns]
-    df = df[cols_exist].copy()
-
-    if "edge_home_abs" in df.columns:
-        df = df.sort_values(["edge_home_abs", "commence_time"], ascending=[False, True])
-    elif "commence_time" in df.columns:
-        df = df.sort_values(["commence_time"], ascending=[True])
-
-    if limit > 0:
-        df = df.head(limit)
+    # The num_books floor was applied at load, and the cached frame is ranked by
+    # (edge desc, commence_time), so rows clearing the edge threshold are a prefix found
+    # by binary search. Freshness is checked block by block down that prefix and the scan
+    # stops once `limit` fresh rows are in hand; the frame is gathered once at the end.
+    edge = df["edge_home_abs"].to_numpy()
+    # A NaN threshold would sort last and admit every row; `edge >= nan` admits none.
+    n = 0 if np.isnan(min_abs_edge) else int(np.searchsorted(-edge, -float(min_abs_edge), side="right"))
+    want = limit if 0 < limit < n else n
+    fresh_cols = df.columns.get_indexer(
+        [c for c in ("sport_key", "last_updated_utc", _UPDATED_AT) if c in df.columns]
+    )
+    block = max(4 * want, 256)
+    kept: List[np.ndarray] = []
+    found = start = 0
+    while start < n and found < want:
+        stop = min(n, start + block)
+        keep = np.flatnonzero(_freshness_mask(df.iloc[start:stop, fresh_cols])) + start
+        kept.append(keep)
+        found += len(keep)
+        start = stop
+    pos = np.concatenate(kept)[:want] if kept else np.empty(0, dtype=np.intp)
 
-    return {"picks": df.to_dict(orient="records")}
+    out_cols = df.columns.get_indexer([c for c in df.columns if c != _UPDATED_AT])
+    return {"picks": df.iloc[pos, out_cols].to_dict(orient="records")}
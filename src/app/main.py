@@ -1,10 +1,23 @@
 # src/app/main.py
 from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI
-from .live import router as live_router
+from .live import router as live_router, warm_baselines
 from .admin import admin_router
+from ._responses import ORJSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm in the background so the server accepts requests (and /health) immediately;
+    # a request racing the warm-up just loads the baseline itself.
+    warm = asyncio.create_task(to_thread.run_sync(warm_baselines))
+    yield
+    await warm
 
-app = FastAPI(title="Smart Bets")
+app = FastAPI(title="Smart Bets", lifespan=lifespan, default_response_class=ORJSONResponse)
 app.include_router(live_router)
 app.include_router(admin_router)
 
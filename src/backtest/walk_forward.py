@@ -1,5 +1,5 @@
 
-import os, argparse, yaml
+import argparse, yaml
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -7,16 +7,12 @@ from joblib import load
 from sklearn.metrics import brier_score_loss
 
 def settle(result, price_decimal, stake):
-    if result == 1:
-        return stake * (price_decimal - 1.0)
-    elif result == 0:
-        return -stake
-    else:
-        return 0.0
+    return np.where(result == 1, stake * (price_decimal - 1.0),
+                    np.where(result == 0, -stake, 0.0))
 
 def kelly_fraction(p, b):
     f = (b*p - (1-p)) / b
-    return max(0.0, min(1.0, f))
+    return np.clip(f, 0.0, 1.0)
 
 def main():
     ap = argparse.ArgumentParser()
@@ -27,7 +23,9 @@ def main():
 
     processed = Path(cfg['paths']['processed'])
     artifacts = Path(cfg['paths']['artifacts'])
-    df = pd.read_csv(processed/'features.csv')
+    feature_cols = cfg['model']['features']
+    keep = set(feature_cols) | {'game_id','price_home_decimal','home_win','market_implied_q_novig'}
+    df = pd.read_csv(processed/'features.csv', usecols=keep.__contains__)
 
     df = df.sort_values('game_id').reset_index(drop=True)
     split = int(len(df)*0.8)
@@ -37,35 +35,30 @@ def main():
     from joblib import load as jload
     if (artifacts/'calibration.joblib').exists():
         cal = jload(artifacts/'calibration.joblib')
-        def calibrate(p): return float(cal.predict([p])[0])
     else:
-        def calibrate(p): return p
+        cal = None
 
-    feature_cols = cfg['model']['features']
     p_test = model.predict_proba(test_df[feature_cols].values)[:,1]
-    p_test = np.array([calibrate(p) for p in p_test])
+    if cal is not None:
+        p_test = np.asarray(cal.predict(p_test), dtype=float)
 
-    q_vig = 1.0/test_df['price_home_decimal'].values
-    hold = q_vig + (1 - q_vig)
-    q_novig = q_vig / hold
+    q_novig = test_df['market_implied_q_novig'].values
 
     edges = p_test - q_novig
     min_edge = cfg['betting']['min_edge']
     kfrac = cfg['betting']['kelly_fraction']
 
-    bankroll = 100000.0
-    pnl_hist = []
-    for i, row in test_df.iterrows():
-        p = p_test[i - split]
-        edge = edges[i - split]
-        if edge < min_edge:
-            continue
-        price_dec = row['price_home_decimal']
-        b = price_dec - 1.0
-        stake = bankroll * kfrac * kelly_fraction(p, b)
-        pnl = settle(row['home_win'], price_dec, stake)
-        bankroll += pnl
-        pnl_hist.append(pnl)
+    # Each bet stakes a fixed Kelly share of the running bankroll, so the bankroll path is a
+    # cumulative product of per-bet growth factors rather than a row-by-row loop.
+    bet = ~(edges < min_edge)
+    price_dec = test_df['price_home_decimal'].values[bet]
+    b = price_dec - 1.0
+    result = test_df['home_win'].values[bet]
+    payoff = settle(result, price_dec, 1.0)
+    growth = 1.0 + kfrac * kelly_fraction(p_test[bet], b) * payoff
+    bankroll_path = 100000.0 * np.cumprod(growth)
+    bankroll = float(bankroll_path[-1]) if len(bankroll_path) else 100000.0
+    pnl_hist = np.diff(bankroll_path, prepend=100000.0)
 
     roi = (bankroll - 100000.0) / 100000.0
     br = brier_score_loss(test_df['home_win'], p_test)
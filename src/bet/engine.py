@@ -1,5 +1,6 @@
 
-import os, argparse, yaml
+import argparse, yaml
+import orjson
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -13,7 +14,7 @@ def decimal_to_prob(d):
 
 def kelly_fraction(p, b):
     f = (b*p - (1-p)) / b
-    return max(0.0, min(1.0, f))
+    return np.clip(f, 0.0, 1.0)
 
 def main():
     ap = argparse.ArgumentParser()
@@ -24,23 +25,22 @@ def main():
 
     processed = Path(cfg['paths']['processed'])
     artifacts = Path(cfg['paths']['artifacts'])
-    df = pd.read_csv(processed/'features.csv')
+    feature_cols = cfg['model']['features']
+    # Parse only the columns scored and reported; features.csv carries more than that.
+    keep = set(feature_cols) | {'game_id','book','price_home_american','price_home_decimal','market_implied_q_novig'}
+    df = pd.read_csv(processed/'features.csv', usecols=keep.__contains__)
 
     model = load(artifacts/'model.joblib')
     if (artifacts/'calibration.joblib').exists():
         cal = load(artifacts/'calibration.joblib')
-        def calibrate(p): return float(cal.predict([p])[0])
     else:
-        def calibrate(p): return p
+        cal = None
 
-    feature_cols = cfg['model']['features']
     probs = model.predict_proba(df[feature_cols].values)[:,1]
-    probs = np.array([calibrate(p) for p in probs])
+    if cal is not None:
+        probs = np.asarray(cal.predict(probs), dtype=float)
 
-    q_vig = 1.0/df['price_home_decimal'].values
-    q_away_vig = 1.0 - q_vig
-    hold = q_vig + q_away_vig
-    q_novig = q_vig / hold
+    q_novig = df['market_implied_q_novig'].values
 
     edges = probs - q_novig
     df_out = df[['game_id','book','price_home_american','price_home_decimal']].copy()
@@ -54,35 +54,37 @@ def main():
     max_risk_per_market = cfg['betting']['max_risk_per_market']
     daily_risk_cap = cfg['betting']['daily_risk_cap']
 
-    picks = []
-    risk_used = 0.0
     cap_daily = daily_risk_cap * bankroll
     cap_market = max_risk_per_market * bankroll
 
-    for row in df_out.sort_values('edge', ascending=False).itertuples():
-        if row.edge < min_edge or risk_used >= cap_daily:
-            continue
-        b = row.price_home_decimal - 1.0
-        f = kfrac * kelly_fraction(row.p_model, b)
-        stake = min(f * bankroll, cap_market, cap_daily - risk_used)
-        if stake <= 0: continue
-        risk_used += stake
-        picks.append({
-            "game_id": row.game_id,
-            "book": row.book,
-            "price_american": int(row.price_home_american),
-            "p_model": float(row.p_model),
-            "q_novig": float(row.q_novig),
-            "edge": float(row.edge),
-            "stake": round(float(stake),2),
-            "kelly_fraction": round(float(f),4)
-        })
+    # Walk the edge ladder strongest-first: each bet takes its capped Kelly stake until the
+    # daily cap is hit, the crossing bet gets the remainder, and everything after is skipped.
+    # Only rows clearing min_edge can be picked, so rank just those instead of sorting them all.
+    idx = np.flatnonzero(edges >= min_edge)
+    idx = idx[np.argsort(-edges[idx], kind="stable")]
+    ranked = df_out.iloc[idx]
+    b = ranked['price_home_decimal'].values - 1.0
+    f = kfrac * kelly_fraction(ranked['p_model'].values, b)
+    want = np.minimum(f * bankroll, cap_market)
+    risk_before = np.concatenate(([0.0], np.cumsum(want)[:-1]))
+    stakes = np.minimum(want, cap_daily - risk_before)
+    keep = stakes > 0
+    ranked, stakes, f = ranked[keep], stakes[keep], f[keep]
+
+    picks = pd.DataFrame({
+        "game_id": ranked['game_id'].values,
+        "book": ranked['book'].values,
+        "price_american": ranked['price_home_american'].values.astype(int),
+        "p_model": ranked['p_model'].values.astype(float),
+        "q_novig": ranked['q_novig'].values.astype(float),
+        "edge": ranked['edge'].values.astype(float),
+        "stake": stakes,
+        "kelly_fraction": f,
+    }).round({"stake": 2, "kelly_fraction": 4}).to_dict(orient="records")
 
     out_path = Path("data") / "model_artifacts" / "picks.json"
     Path("data/model_artifacts").mkdir(parents=True, exist_ok=True)
-    import json
-    with open(out_path, "w") as f:
-        json.dump(picks, f, indent=2)
+    out_path.write_bytes(orjson.dumps(picks, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     print(f"Wrote {out_path} with {len(picks)} picks")
     if picks[:5]:
         print("Top 5 picks preview:")
@@ -1,21 +1,21 @@
 
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 
-def flatten_odds_event(ev: Dict[str, Any]) -> List[Dict[str, Any]]:
-    rows = []
+def iter_flatten_odds_event(ev: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # Event-level fields are read once; the per-outcome work is a single dict build.
     event_id = ev.get("id")
     sport_key = ev.get("sport_key")
     commence_time = ev.get("commence_time")
     home = ev.get("home_team")
     away = ev.get("away_team")
-    for bm in ev.get("bookmakers", []):
+    for bm in ev.get("bookmakers", ()):
         book_key = bm.get("key")
         book_title = bm.get("title")
         last_update = bm.get("last_update")
-        for mkt in bm.get("markets", []):
+        for mkt in bm.get("markets", ()):
             market_key = mkt.get("key")
-            for outcome in mkt.get("outcomes", []):
-                rows.append({
+            yield from (
+                {
                     "event_id": event_id,
                     "sport_key": sport_key,
                     "commence_time": commence_time,
@@ -28,5 +28,9 @@ def flatten_odds_event(ev: Dict[str, Any]) -> List[Dict[str, Any]]:
                     "outcome_name": outcome.get("name"),
                     "price": outcome.get("price"),
                     "point": outcome.get("point"),
-                })
-    return rows
+                }
+                for outcome in mkt.get("outcomes", ())
+            )
+
+def flatten_odds_event(ev: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(iter_flatten_odds_event(ev))
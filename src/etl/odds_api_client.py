@@ -4,12 +4,23 @@ from __future__ import annotations
 import os
 import json
 import time
+import hashlib
 import errno
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import fcntl
+except ImportError:  # Windows dev box: only the in-process lock applies
+    fcntl = None
 
 
 class OddsAPIError(Exception):
@@ -25,10 +36,24 @@ DEFAULT_REGIONS = os.getenv("ODDS_API_REGIONS", "us,eu")
 DEFAULT_MARKETS = os.getenv("ODDS_API_MARKETS", "h2h")
 DEFAULT_ODDS_FORMAT = os.getenv("ODDS_API_FORMAT", "american")
 
+# Max in-flight requests when a driver fans out over sports/events
+MAX_CONCURRENCY = max(1, int(os.getenv("ODDS_API_CONCURRENCY", "4") or "4"))
+
 # Budget lock
 BUDGET_PATH = Path(os.getenv("ODDS_BUDGET_STORE", "/tmp/odds_budget.json"))
 DAILY_BUDGET = int(os.getenv("ODDS_DAILY_BUDGET", "0") or "0")  # 0 = disabled
 CRON_TZ = os.getenv("CRON_TZ", "UTC")
+# Budget check+spend is a read-modify-write of one file shared by every pull worker
+# process: _budget_locked() holds this thread lock plus an flock on BUDGET_LOCK_PATH.
+_BUDGET_LOCK = threading.Lock()
+BUDGET_LOCK_PATH = BUDGET_PATH.with_name(f"{BUDGET_PATH.name}.lock")
+# Last state read/written by this process, keyed by the file's (inode, mtime, size). Only
+# status reads use it; spends re-read the file under the lock.
+_BUDGET_CACHE: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
+
+# Response cache: identical queries within the TTL are served from disk (no quota, no RTT)
+CACHE_DIR = Path(os.getenv("ODDS_CACHE_DIR", "/tmp/odds_cache"))
+CACHE_TTL = float(os.getenv("ODDS_CACHE_TTL", "0") or "0")  # seconds; 0 = disabled
 
 
 # ---------- Budget helpers ----------
@@ -46,27 +71,45 @@ def _today_key(now_ts: Optional[float] = None) -> str:
     return dt.strftime("%Y-%m-%d")
 
 
-def _load_budget() -> Dict[str, Any]:
-    if not BUDGET_PATH.exists():
+def _budget_sig() -> Optional[Tuple[int, int, int]]:
+    try:
+        st = BUDGET_PATH.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _load_budget(fresh: bool = False) -> Dict[str, Any]:
+    global _BUDGET_CACHE
+    sig = _budget_sig()
+    if sig is None:
         return {"date": _today_key(), "count": 0}
+    if not fresh and _BUDGET_CACHE is not None and _BUDGET_CACHE[0] == sig:
+        return dict(_BUDGET_CACHE[1])
     try:
         with open(BUDGET_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
         if not isinstance(data, dict):
             return {"date": _today_key(), "count": 0}
-        return data
+        _BUDGET_CACHE = (sig, data)
+        return dict(data)
     except Exception:
         return {"date": _today_key(), "count": 0}
 
 
 def _save_budget(data: Dict[str, Any]) -> None:
+    global _BUDGET_CACHE
     try:
         BUDGET_PATH.parent.mkdir(parents=True, exist_ok=True)
     except OSError as e:
         if e.errno != errno.EEXIST:
             raise
-    with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+    tmp = BUDGET_PATH.with_name(f"{BUDGET_PATH.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f)
+    os.replace(tmp, BUDGET_PATH)  # atomic: concurrent readers never see a torn file
+    sig = _budget_sig()
+    _BUDGET_CACHE = (sig, dict(data)) if sig is not None else None
 
 
 def _reset_if_new_day(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -76,21 +119,50 @@ def _reset_if_new_day(state: Dict[str, Any]) -> Dict[str, Any]:
     return state
 
 
-def _can_spend(n: int) -> bool:
+@contextmanager
+def _budget_locked():
+    with _BUDGET_LOCK:
+        if fcntl is None:
+            yield
+            return
+        BUDGET_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # A sidecar file, because saves os.replace the store itself (a new inode each time).
+        with open(BUDGET_LOCK_PATH, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _try_spend(n: int) -> bool:
+    # One load for both the check and the spend (the caller holds _budget_locked()).
     if DAILY_BUDGET <= 0:
         return True
-    state = _reset_if_new_day(_load_budget())
-    return (state.get("count", 0) + n) <= DAILY_BUDGET
+    state = _reset_if_new_day(_load_budget(fresh=True))
+    count = int(state.get("count", 0))
+    if count + n > DAILY_BUDGET:
+        return False
+    state["count"] = count + n
+    _save_budget(state)
+    return True
 
 
 def _spend(n: int) -> None:
-    if DAILY_BUDGET <= 0:
+    # Unconditional: for requests already sent (adapter retries), so the count may pass
+    # the limit; the next _try_spend then refuses. Caller holds _budget_locked().
+    if DAILY_BUDGET <= 0 or n <= 0:
         return
-    state = _reset_if_new_day(_load_budget())
+    state = _reset_if_new_day(_load_budget(fresh=True))
     state["count"] = int(state.get("count", 0)) + n
     _save_budget(state)
 
 
+def _retry_count(r: requests.Response) -> int:
+    retries = getattr(r.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
 def get_budget_status() -> Dict[str, Any]:
     state = _reset_if_new_day(_load_budget())
     return {
@@ -104,6 +176,27 @@ def get_budget_status() -> Dict[str, Any]:
 
 
 # ---------- Core HTTP ----------
+def _make_session() -> requests.Session:
+    # One keep-alive pool per process: every call after the first reuses the TCP/TLS
+    # connection. Transient 5xx are retried with backoff; each resend is charged to the
+    # budget in _get. 429 is not retried: resending would only fight the rate limit.
+    retry = Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(16, MAX_CONCURRENCY), max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+
 def _require_key():
     if not ODDS_API_KEY:
         raise OddsAPIError("Set ODDS_API_KEY in your environment or .env file.")
@@ -117,25 +210,75 @@ def _url(path: str) -> str:
 
 def _get(path: str, params: Dict[str, Any]) -> requests.Response:
     _require_key()
-    if not _can_spend(1):
-        status = get_budget_status()
-        raise OddsAPIError(
-            f"Daily request budget exceeded: used={status['used']} limit={status['limit']} date={status['date']} tz={status['tz']}"
-        )
-    r = requests.get(_url(path), params=params, timeout=30)
-    _spend(1)  # count it regardless of status
+    # Reserve the request up front (counted regardless of status) so concurrent callers
+    # can't all pass the check on the same remaining budget.
+    with _budget_locked():
+        if not _try_spend(1):
+            status = get_budget_status()
+            raise OddsAPIError(
+                f"Daily request budget exceeded: used={status['used']} limit={status['limit']} date={status['date']} tz={status['tz']}"
+            )
+    r = _SESSION.get(_url(path), params=params, timeout=30)
+    extra = _retry_count(r)
+    if extra:
+        with _budget_locked():
+            _spend(extra)
     if r.status_code != 200:
         raise OddsAPIError(f"{path} failed: {r.status_code} {r.text}")
     return r
 
 
+def _json(r: requests.Response) -> Any:
+    # orjson parses the raw bytes directly (no text decode, C float parsing); the /odds
+    # payloads are large and almost entirely numbers.
+    return orjson.loads(r.content)
+
+
+# ---------- Response cache ----------
+def _cache_path(path: str, params: Dict[str, Any]) -> Path:
+    # The API key is left out so rotating it doesn't invalidate the cache.
+    items = sorted((k, str(v)) for k, v in params.items() if k != "apiKey")
+    digest = hashlib.sha1(orjson.dumps([path, items])).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+
+def _cache_read(p: Path) -> Optional[bytes]:
+    try:
+        if time.time() - p.stat().st_mtime >= CACHE_TTL:
+            return None
+        return p.read_bytes()
+    except OSError:
+        return None
+
+
+def _cache_write(p: Path, body: bytes) -> None:
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, p)  # readers never see a partial body
+    except OSError as e:
+        print(f"[WARN] odds cache write failed for {p}: {e}")
+
+
+def _get_json(path: str, params: Dict[str, Any]) -> Any:
+    if CACHE_TTL <= 0:
+        return _json(_get(path, params))
+    cp = _cache_path(path, params)
+    body = _cache_read(cp)
+    if body is None:
+        # A hit skips _get entirely, so it never touches the daily budget either.
+        body = _get(path, params).content
+        _cache_write(cp, body)
+    return orjson.loads(body)
+
+
 # ---------- Public functions ----------
 def list_sports(all: bool = False) -> List[Dict[str, Any]]:
     params = {"apiKey": ODDS_API_KEY}
     if all:
         params["all"] = "true"
-    r = _get("/v4/sports", params)
-    return r.json()  # type: ignore
+    return _get_json("/v4/sports", params)  # type: ignore
 
 
 def get_odds(
@@ -159,8 +302,7 @@ def get_odds(
     if event_ids:
         params["eventIds"] = event_ids
 
-    r = _get(f"/v4/sports/{sport_key}/odds", params)
-    data = r.json()
+    data = _get_json(f"/v4/sports/{sport_key}/odds", params)
     if not isinstance(data, list):
         raise OddsAPIError("Unexpected response for /odds")
     return data  # type: ignore
@@ -185,8 +327,7 @@ def get_event_odds(
     if bookmakers:
         params["bookmakers"] = bookmakers
 
-    r = _get(f"/v4/sports/{sport_key}/events/{event_id}/odds", params)
-    data = r.json()
+    data = _get_json(f"/v4/sports/{sport_key}/events/{event_id}/odds", params)
     if not isinstance(data, dict):
         raise OddsAPIError("Unexpected response for /events/{id}/odds")
     return data  # type: ignore
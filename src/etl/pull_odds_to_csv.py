@@ -1,9 +1,11 @@
 
 import os, argparse
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import pandas as pd
 from pathlib import Path
-from .odds_api_client import get_odds
-from .normalize import flatten_odds_event
+from .odds_api_client import MAX_CONCURRENCY, get_odds
+from .normalize import iter_flatten_odds_event
 
 SPORT_KEYS_DEFAULT = [
     "americanfootball_nfl",
@@ -13,20 +15,25 @@ SPORT_KEYS_DEFAULT = [
     "basketball_nba",
 ]
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--sports", nargs="*", default=SPORT_KEYS_DEFAULT)
     ap.add_argument("--regions", default=os.getenv("ODDS_API_REGIONS", "us,us2"))
     ap.add_argument("--markets", default=os.getenv("ODDS_API_MARKETS", "h2h,spreads,totals"))
     ap.add_argument("--odds_format", default=os.getenv("ODDS_API_FORMAT", "american"))
     ap.add_argument("--out", default=os.getenv("DATA_DIR", "./data") + "/raw/odds_latest.csv")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
+    def _fetch(sk):
+        return get_odds(sk, regions=args.regions, markets=args.markets, odds_format=args.odds_format)
+
+    # Sports are independent requests: fetch them concurrently (network-bound, so threads),
+    # then flatten in the original sport order.
     all_rows = []
-    for sk in args.sports:
-        events = get_odds(sk, regions=args.regions, markets=args.markets, odds_format=args.odds_format)
-        for ev in events:
-            all_rows.extend(flatten_odds_event(ev))
+    sports = list(args.sports)
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_CONCURRENCY, len(sports)))) as ex:
+        for events in ex.map(_fetch, sports):
+            all_rows.extend(chain.from_iterable(map(iter_flatten_odds_event, events)))
 
     df = pd.DataFrame(all_rows)
     Path(os.path.dirname(args.out)).mkdir(parents=True, exist_ok=True)
@@ -1,11 +1,11 @@
 import os
+import csv
 import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
-import pandas as pd
-
-from .odds_api_client import get_odds, get_event_odds
+from .odds_api_client import MAX_CONCURRENCY, get_odds, get_event_odds
 
 # Period markets we want to pull per sport
 PERIOD_MARKETS = {
@@ -17,6 +17,11 @@ PERIOD_MARKETS = {
     # "icehockey_nhl": ["h2h_p1"],
 }
 
+FIELDS = [
+    "event_id", "sport_key", "commence_time", "home_team", "away_team", "book_key",
+    "book_title", "last_update", "market_key", "outcome_name", "price", "point",
+]
+
 def flatten(ev: Dict[str, Any], sport_key: str, bm: Dict[str, Any], mkt: Dict[str, Any], outcome: Dict[str, Any], period_key: str):
     return {
         "event_id": ev.get("id"),
@@ -33,51 +38,75 @@ def flatten(ev: Dict[str, Any], sport_key: str, bm: Dict[str, Any], mkt: Dict[st
         "point": outcome.get("point"),
     }
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--sports", nargs="*", default=list(PERIOD_MARKETS.keys()))
     ap.add_argument("--regions", default=os.getenv("ODDS_API_REGIONS", "us,eu"))
     ap.add_argument("--odds_format", default=os.getenv("ODDS_API_FORMAT", "american"))
     ap.add_argument("--out", default=os.getenv("DATA_DIR", "./data") + "/raw/odds_periods_latest.csv")
     ap.add_argument("--max_events", type=int, default=30, help="Max events per sport to process (prevents timeouts).")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
-    rows: List[Dict[str, Any]] = []
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    for sk in args.sports:
+    def _events(sk: str) -> List[Dict[str, Any]]:
         # 1) Get upcoming events (use simple h2h to enumerate event IDs cheaply)
         try:
             events = get_odds(sk, regions=args.regions, markets="h2h", odds_format=args.odds_format)
         except Exception as e:
             print(f"[WARN] get_odds failed for {sk}: {e}")
-            continue
-
+            return []
         # Cap number of events to avoid long server calls
-        events = (events or [])[: max(0, args.max_events)]
+        return (events or [])[: max(0, args.max_events)]
 
-        # 2) For each event, request the specific period markets
-        for ev in events:
-            ev_id = ev.get("id")
-            if not ev_id:
-                continue
-            for mkt_key in PERIOD_MARKETS.get(sk, []):
-                try:
-                    data = get_event_odds(sk, ev_id, regions=args.regions, markets=mkt_key, odds_format=args.odds_format)
-                except Exception as e:
-                    print(f"[WARN] get_event_odds failed for {sk} {ev_id} {mkt_key}: {e}")
-                    continue
+    def _event_odds(task: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        sk, ev_id, mkt_key = task
+        try:
+            return get_event_odds(sk, ev_id, regions=args.regions, markets=mkt_key, odds_format=args.odds_format)
+        except Exception as e:
+            print(f"[WARN] get_event_odds failed for {sk} {ev_id} {mkt_key}: {e}")
+            return None
 
+    # Each (sport, event, market) lookup is an independent request, so both stages fan out
+    # over a bounded thread pool; results are flattened afterwards in request order.
+    # Rows are written as each response is flattened (buffered, sequential) instead of
+    # being collected into a list of dicts and converted through a DataFrame at the end.
+    # They go to a temp file swapped in at the end, so a failed pull keeps the last good CSV.
+    n_rows = 0
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as ex, \
+                open(tmp_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+            writer.writeheader()
+            # 2) For each event, request the specific period markets
+            tasks = [
+                (sk, ev.get("id"), mkt_key)
+                for sk, events in zip(args.sports, ex.map(_events, args.sports))
+                for ev in events
+                if ev.get("id")
+                for mkt_key in PERIOD_MARKETS.get(sk, [])
+            ]
+            for (sk, _, mkt_key), data in zip(tasks, ex.map(_event_odds, tasks)):
+                if data is None:
+                    continue
                 # Response: event dict with bookmakers -> markets -> outcomes
                 for bm in data.get("bookmakers", []) or []:
                     for m in bm.get("markets", []) or []:
                         for outc in m.get("outcomes", []) or []:
-                            rows.append(flatten(data, sk, bm, m, outc, mkt_key))
+                            writer.writerow(flatten(data, sk, bm, m, outc, mkt_key))
+                            n_rows += 1
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        # Don't leave a partial temp file behind for the next run.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
-    df = pd.DataFrame(rows)
-    df.to_csv(out_path, index=False)
-    print(f"Wrote {out_path} with {len(df)} rows.")
+    print(f"Wrote {out_path} with {n_rows} rows.")
 
 if __name__ == "__main__":
     main()
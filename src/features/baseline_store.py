@@ -0,0 +1,58 @@
+# src/features/baseline_store.py
+"""
+Persistence for the processed market baselines.
+
+The CSV stays the canonical, human-readable artifact. Next to it we write a Parquet
+copy (same stem, `.parquet`) that /picks_live loads far faster than re-parsing CSV.
+Readers should only trust the Parquet file when it is at least as new as the CSV,
+so a CSV rewritten by some other tool never gets shadowed by a stale Parquet.
+"""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Low-cardinality string columns stored as dictionary-encoded categoricals.
+CATEGORICAL_COLS = ("sport_key", "home_team", "away_team")
+
+
+def parquet_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Materialise the per-row values /picks_live filters and sorts on."""
+    if "consensus_home_q" in df.columns:
+        q = df["consensus_home_q"].to_numpy(dtype=float)
+        df = df.assign(edge_home_abs=np.abs(q - 0.5))
+    return df
+
+
+def write_baseline(df: pd.DataFrame, csv_path: str) -> None:
+    """Write `df` (plus derived columns) to `csv_path` and its Parquet sibling."""
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    df = add_derived_columns(df)
+    df.to_csv(csv_path, index=False)
+
+    pq_path = parquet_path_for(csv_path)
+    tmp_path = pq_path + ".tmp"
+    try:
+        # Rows ranked by edge (strongest first), so readers ranking by edge find the
+        # file already in order and threshold scans become a prefix.
+        out = df.sort_values("edge_home_abs", ascending=False, kind="stable", na_position="last") \
+            if "edge_home_abs" in df.columns else df.copy()
+        for c in CATEGORICAL_COLS:
+            if c in out.columns:
+                out[c] = out[c].astype("category")
+        out.to_parquet(tmp_path, index=False)
+        # Atomic swap so a concurrent reader never sees a half-written file.
+        os.replace(tmp_path, pq_path)
+    except Exception as e:
+        print(f"[WARN] parquet write failed for {pq_path}: {e}")
+        for p in (tmp_path, pq_path):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
@@ -1,6 +1,7 @@
 # src/features/filter_books.py
 import os
 import sys
+import numpy as np
 import pandas as pd
 
 def main():
@@ -19,14 +20,20 @@ def main():
         return
 
     allowed = [b.strip() for b in allow_csv.split(",") if b.strip()]
-    df = pd.read_csv(in_path)
+    # book_key repeats a handful of values across every row: parse it as a categorical so
+    # the allowlist test below compares per category, not per row.
+    df = pd.read_csv(in_path, dtype={"book_key": "category"})
     if "book_key" not in df.columns:
         # Nothing to filter on — just write through
         df.to_csv(out_path, index=False)
         print(f"book_key column not found. Copied {in_path} -> {out_path} (rows={len(df)})")
         return
 
-    out = df[df["book_key"].isin(allowed)].copy()
+    # Test the allowlist once per category, then map back to rows through the integer codes
+    # (code -1, a missing book_key, lands on the trailing False).
+    book = df["book_key"].cat
+    allowed_cat = np.append(book.categories.isin(frozenset(allowed)), False)
+    out = df[allowed_cat[book.codes.to_numpy()]]
     out.to_csv(out_path, index=False)
     print(f"Filtered to allowed books: {allowed}. {len(out)}/{len(df)} rows -> {out_path}")
 
@@ -1,14 +1,16 @@
 import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-def american_to_decimal(A):
-    return (100/abs(A))+1 if A < 0 else (A/100)+1
+from .baseline_store import write_baseline
 
-def novig_two_way(dec_prices):
-    inv = [1.0/p for p in dec_prices]
-    hold = sum(inv)
-    return [v/hold for v in inv]
+def american_to_decimal(A):
+    # Elementwise over a whole price column (scalars work too); both branches are cheap
+    # ufuncs, so evaluating both and selecting beats a per-row Python call.
+    A = np.asarray(A, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(A < 0, (100/np.abs(A))+1, (A/100)+1)
 
 def main():
     data_dir = Path(os.getenv("DATA_DIR", "./data"))
@@ -21,50 +23,57 @@ def main():
     if not src.exists():
         raise FileNotFoundError(f"Missing {src}. Run: python -m src.etl.pull_period_odds_to_csv")
 
-    df = pd.read_csv(src)
+    # Parse only the columns used; the repeated low-cardinality keys come in as categoricals
+    # (parsed once per distinct value) instead of one Python string per row.
+    df = pd.read_csv(
+        src,
+        usecols=["event_id", "sport_key", "book_key", "market_key", "home_team", "away_team", "outcome_name", "price"],
+        dtype={"sport_key": "category", "book_key": "category", "market_key": "category"},
+    )
 
     # Keep our target period markets: 1st half (h2h_h1) and MLB F5 (h2h_1st_5_innings)
     df = df[df["market_key"].isin(["h2h_h1", "h2h_1st_5_innings"])].copy()
 
-    # Label side by team name
-    def side(row):
-        if row["outcome_name"] == row["home_team"]:
-            return "home"
-        if row["outcome_name"] == row["away_team"]:
-            return "away"
-        return "other"
-
-    df["side"] = df.apply(side, axis=1)
+    # Label side by team name (column-wise compare, not a per-row apply)
+    outcome = df["outcome_name"].to_numpy()
+    df["side"] = np.where(
+        outcome == df["home_team"].to_numpy(), "home",
+        np.where(outcome == df["away_team"].to_numpy(), "away", "other"),
+    )
     df = df[df["side"].isin(["home", "away"])]
 
     # Convert American to decimal
-    df["price_decimal"] = df["price"].apply(american_to_decimal)
+    df["price_decimal"] = american_to_decimal(df["price"].to_numpy())
 
-    rows = []
-    for (event_id, book_key, market_key), sub in df.groupby(["event_id", "book_key", "market_key"]):
-        sub = sub.set_index("side")
-        if not {"home", "away"}.issubset(sub.index):
-            continue
-        home_dec = float(sub.loc["home", "price_decimal"])
-        away_dec = float(sub.loc["away", "price_decimal"])
-        q_home, q_away = novig_two_way([home_dec, away_dec])
+    # One row per (event, book, market) side, then join home to away: the same pairs the
+    # old per-group set_index loop produced, without a Python iteration per group.
+    keys = ["event_id", "book_key", "market_key"]
+    df = df.dropna(subset=keys)
+    home = df[df["side"] == "home"].drop_duplicates(keys)
+    away = df[df["side"] == "away"].drop_duplicates(keys)
+    out = home[keys + ["sport_key", "home_team", "price_decimal"]].merge(
+        away[keys + ["away_team", "price_decimal"]], on=keys, suffixes=("_home", "_away")
+    ).sort_values(keys, kind="stable", ignore_index=True)
 
-        rows.append({
-            "event_id": event_id,
-            "sport_key": sub.loc["home", "sport_key"],
-            "book_key": book_key,
-            "market_key": market_key,
-            "home_team": sub.loc["home", "home_team"],
-            "away_team": sub.loc["away", "away_team"],
-            "home_price_decimal": home_dec,
-            "away_price_decimal": away_dec,
-            "home_q_novig": q_home,
-            "away_q_novig": q_away,
-        })
+    home_dec = out["price_decimal_home"].to_numpy(dtype=float)
+    away_dec = out["price_decimal_away"].to_numpy(dtype=float)
+    inv_home, inv_away = 1.0/home_dec, 1.0/away_dec
+    hold = inv_home + inv_away
+    out = pd.DataFrame({
+        "event_id": out["event_id"],
+        "sport_key": out["sport_key"],
+        "book_key": out["book_key"],
+        "market_key": out["market_key"],
+        "home_team": out["home_team"],
+        "away_team": out["away_team"],
+        "home_price_decimal": home_dec,
+        "away_price_decimal": away_dec,
+        "home_q_novig": inv_home/hold,
+        "away_q_novig": inv_away/hold,
+    })
 
-    out = pd.DataFrame(rows)
     out_path = processed / "market_baselines_firsthalf.csv"
-    out.to_csv(out_path, index=False)
+    write_baseline(out, str(out_path))
     print(f"Wrote {out_path} with {len(out)} rows")
 
 if __name__ == "__main__":
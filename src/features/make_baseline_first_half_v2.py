@@ -12,62 +12,61 @@ Output: data/processed/market_baselines_firsthalf.csv with:
   event_id, sport_key, commence_time, home_team, away_team,
   consensus_home_q, consensus_away_q,
   consensus_home_fair_odds, consensus_away_fair_odds,
-  num_books, books_used, last_updated_utc
+  num_books, books_used, last_updated_utc, edge_home_abs
 """
 
 from __future__ import annotations
 
 import os
+import numpy as np
 import pandas as pd
-from typing import Iterable
+
+from .baseline_store import write_baseline
 
 RAW_PATH = "data/raw/odds_periods_latest.csv"
 OUT_PATH = "data/processed/market_baselines_firsthalf.csv"
 
 
-def _american_to_prob(ml):
-    try:
-        ml = float(ml)
-    except Exception:
-        return float("nan")
-    if ml > 0:
-        return 100.0 / (ml + 100.0)
-    elif ml < 0:
-        ml = abs(ml)
-        return ml / (ml + 100.0)
-    return float("nan")
+def _american_to_prob(ml: pd.Series) -> np.ndarray:
+    ml = pd.to_numeric(ml, errors="coerce").to_numpy(dtype=float)
+    a = np.abs(ml)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.where(ml > 0, 100.0 / (ml + 100.0), a / (a + 100.0))
+    q[ml == 0] = np.nan
+    return q
 
 
-def _prob_to_american(q: float):
-    if q <= 0 or q >= 1:
-        return float("nan")
-    dec = 1.0 / q
-    return (dec - 1.0) * 100.0 if dec >= 2.0 else -100.0 / (dec - 1.0)
+def _prob_to_american(q: pd.Series) -> np.ndarray:
+    q = q.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dec = 1.0 / q
+        odds = np.where(dec >= 2.0, (dec - 1.0) * 100.0, -100.0 / (dec - 1.0))
+    odds[~((q > 0) & (q < 1))] = np.nan
+    return odds
 
 
-def _filter_allowlists(df: pd.DataFrame) -> pd.DataFrame:
-    books_env = os.getenv("BOOKS_ALLOWED", "")
-    books = [b.strip() for b in books_env.split(",") if b.strip()] if books_env else []
-    if books:
-        df = df[df["book_key"].isin(books)].copy()
+def _env_set(name: str) -> frozenset:
+    return frozenset(v.strip() for v in os.getenv(name, "").split(",") if v.strip())
+
 
-    sports_env = os.getenv("SPORTS_ALLOWED", "")
-    sports = [s.strip() for s in sports_env.split(",") if s.strip()] if sports_env else []
-    if sports:
-        df = df[df["sport_key"].isin(sports)].copy()
+# Allowlists are parsed once per process (these modules run in long-lived workers).
+BOOKS_ALLOWED = _env_set("BOOKS_ALLOWED")
+SPORTS_ALLOWED = _env_set("SPORTS_ALLOWED")  # optional
 
-    return df
+
+def _filter_allowlists(df: pd.DataFrame) -> pd.DataFrame:
+    mask = None
+    if BOOKS_ALLOWED:
+        mask = df["book_key"].isin(BOOKS_ALLOWED)
+    if SPORTS_ALLOWED:
+        m = df["sport_key"].isin(SPORTS_ALLOWED)
+        mask = m if mask is None else mask & m
+    return df if mask is None else df[mask].copy()
 
 
-def _latest_update_iso(series: Iterable[str]) -> str:
-    try:
-        ts = pd.to_datetime(series, utc=True, errors="coerce")
-        mx = ts.max()
-        if pd.isna(mx):
-            return ""
-        return mx.strftime("%Y-%m-%dT%H:%M:%SZ")
-    except Exception:
-        return ""
+def _iso_or_blank(ts: pd.Series) -> pd.Series:
+    # Formats per-group max timestamps; groups with no parseable update become "".
+    return ts.dt.strftime("%Y-%m-%dT%H:%M:%SZ").fillna("")
 
 
 def _map_side(df: pd.DataFrame) -> pd.DataFrame:
@@ -109,8 +108,7 @@ def _map_side(df: pd.DataFrame) -> pd.DataFrame:
 
 def _ensure_written(df_out: pd.DataFrame, reason: str):
     """Always write the output file, even if 0 rows, and print a clear message."""
-    os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
-    df_out.to_csv(OUT_PATH, index=False)
+    write_baseline(df_out, OUT_PATH)
     print(f"Wrote {OUT_PATH} with {len(df_out)} rows ({reason})")
 
 
@@ -126,7 +124,9 @@ def build_consensus() -> pd.DataFrame:
         _ensure_written(empty, "no raw file")
         return empty
 
-    df = pd.read_csv(RAW_PATH)
+    # book_key is low-cardinality and only filtered/counted, so keep it as integer codes.
+    # (sport_key stays object: as a categorical groupby key it would need observed=True.)
+    df = pd.read_csv(RAW_PATH, dtype={"book_key": "category"})
 
     needed = {
         "event_id", "sport_key", "commence_time", "home_team", "away_team",
@@ -141,7 +141,7 @@ def build_consensus() -> pd.DataFrame:
     df = _map_side(df)
 
     # Convert to implied probabilities and drop invalids
-    df["q"] = df["price"].map(_american_to_prob)
+    df["q"] = _american_to_prob(df["price"])
     df = df[pd.notna(df["q"]) & (df["q"] > 0) & (df["q"] < 1)].copy()
 
     # If nothing remains, still write an empty file so /picks_live doesn't complain
@@ -156,14 +156,21 @@ def build_consensus() -> pd.DataFrame:
         return empty
 
     keys = ["event_id", "sport_key", "commence_time", "home_team", "away_team"]
+    # Parse update stamps once for the whole frame (not once per group) and take the
+    # per-group max as a native datetime reduction. pivot_table below sorts its index,
+    # so the groupby's own key sort is skipped.
+    df["_last_update_ts"] = pd.to_datetime(
+        df["last_update"], utc=True, errors="coerce", format="ISO8601"
+    )
     side_mean = (
-        df.groupby(keys + ["side"])
+        df.groupby(keys + ["side"], sort=False)
           .agg(consensus_q=("q", "mean"),
                books_used=("book_key", lambda x: ",".join(sorted(set(x)))),
-               num_books=("book_key", lambda x: len(set(x))),
-               last_updated_utc=("last_update", _latest_update_iso))
+               num_books=("book_key", "nunique"),
+               last_updated_utc=("_last_update_ts", "max"))
           .reset_index()
     )
+    side_mean["last_updated_utc"] = _iso_or_blank(side_mean["last_updated_utc"])
 
     pivot = side_mean.pivot_table(
         index=keys,
@@ -194,8 +201,8 @@ def build_consensus() -> pd.DataFrame:
     if ("last_updated_utc" not in out or out["last_updated_utc"].isna().all()) and "last_updated_utc_away" in pivot.columns:
         out["last_updated_utc"] = pivot["last_updated_utc_away"]
 
-    out["consensus_home_fair_odds"] = out["consensus_home_q"].map(_prob_to_american)
-    out["consensus_away_fair_odds"] = out["consensus_away_q"].map(_prob_to_american)
+    out["consensus_home_fair_odds"] = _prob_to_american(out["consensus_home_q"])
+    out["consensus_away_fair_odds"] = _prob_to_american(out["consensus_away_q"])
 
     cols = [
         "event_id","sport_key","commence_time","home_team","away_team",
@@ -210,7 +217,8 @@ def build_consensus() -> pd.DataFrame:
     return out
 
 
-def main():
+def main(argv: list[str] | None = None):
+    # No CLI options; argv is accepted so callers can invoke every pipeline module alike.
     build_consensus()
 
 
@@ -7,6 +7,8 @@ from typing import List
 
 import pandas as pd
 
+from .baseline_store import write_baseline
+
 
 RAW_IN = "data/raw/odds_latest.csv"
 OUT = "data/processed/market_baselines_h2h.csv"
@@ -208,7 +210,8 @@ def build_consensus(df: pd.DataFrame) -> pd.DataFrame:
     df["p_home_nv"] = df["p_home_raw"] / s
     df["p_away_nv"] = df["p_away_raw"] / s
 
-    # Aggregate across books per event
+    # Aggregate across books per event (book as integer codes for the nunique count)
+    df["book"] = df["book"].astype("category")
     grp_cols = ["event_id", "sport_key", "commence_time", "home_team", "away_team"]
     agg = df.groupby(grp_cols).agg(
         consensus_home_q=("p_home_nv", "mean"),
@@ -240,8 +243,7 @@ def build_consensus(df: pd.DataFrame) -> pd.DataFrame:
         pass
     agg = agg.sort_values(["commence_time", "home_team"], na_position="last").copy()
 
-    os.makedirs(os.path.dirname(OUT), exist_ok=True)
-    agg.to_csv(OUT, index=False)
+    write_baseline(agg, OUT)
     return agg
 
 
@@ -11,83 +11,76 @@ Output: data/processed/market_baselines_h2h.csv with at least:
   event_id, sport_key, commence_time, home_team, away_team,
   consensus_home_q, consensus_away_q,
   consensus_home_fair_odds, consensus_away_fair_odds,
-  num_books, books_used, last_updated_utc
+  num_books, books_used, last_updated_utc, edge_home_abs
 """
 
 from __future__ import annotations
 
 import os
-import math
+import numpy as np
 import pandas as pd
-from typing import Iterable
+
+from .baseline_store import write_baseline
 
 RAW_PATH = "data/raw/odds_latest.csv"
 OUT_PATH = "data/processed/market_baselines_h2h.csv"
 
 
-def _american_to_prob(ml: float | int) -> float:
+def _american_to_prob(ml: pd.Series) -> np.ndarray:
     """
     Convert American odds to implied probability (no vig removal here).
-    +150 -> 100/(150+100); -150 -> 150/(150+100)
+    +150 -> 100/(150+100); -150 -> 150/(150+100); 0 or unparsable -> NaN
     """
-    try:
-        ml = float(ml)
-    except Exception:
-        return float("nan")
-
-    if ml > 0:
-        return 100.0 / (ml + 100.0)
-    elif ml < 0:
-        ml = abs(ml)
-        return ml / (ml + 100.0)
-    else:
-        return float("nan")
-
-
-def _prob_to_american(q: float) -> float:
-    """Convert probability to no-vig fair American odds."""
-    if q <= 0 or q >= 1:
-        return float("nan")
-    dec = 1.0 / q
-    # american
-    if dec >= 2.0:
-        return (dec - 1.0) * 100.0
-    else:
-        return -100.0 / (dec - 1.0)
+    ml = pd.to_numeric(ml, errors="coerce").to_numpy(dtype=float)
+    a = np.abs(ml)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.where(ml > 0, 100.0 / (ml + 100.0), a / (a + 100.0))
+    q[ml == 0] = np.nan
+    return q
 
 
-def _filter_allowlists(df: pd.DataFrame) -> pd.DataFrame:
-    # Books allowlist
-    books_env = os.getenv("BOOKS_ALLOWED", "")
-    books = [b.strip() for b in books_env.split(",") if b.strip()] if books_env else []
-    if books:
-        df = df[df["book_key"].isin(books)].copy()
+def _prob_to_american(q: pd.Series) -> np.ndarray:
+    """Convert probabilities to no-vig fair American odds (NaN outside (0, 1))."""
+    q = q.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dec = 1.0 / q
+        # american
+        odds = np.where(dec >= 2.0, (dec - 1.0) * 100.0, -100.0 / (dec - 1.0))
+    odds[~((q > 0) & (q < 1))] = np.nan
+    return odds
+
+
+def _env_set(name: str) -> frozenset:
+    return frozenset(v.strip() for v in os.getenv(name, "").split(",") if v.strip())
 
-    # Sports allowlist (optional)
-    sports_env = os.getenv("SPORTS_ALLOWED", "")
-    sports = [s.strip() for s in sports_env.split(",") if s.strip()] if sports_env else []
-    if sports:
-        df = df[df["sport_key"].isin(sports)].copy()
 
-    return df
+# Allowlists are parsed once per process (these modules run in long-lived workers).
+BOOKS_ALLOWED = _env_set("BOOKS_ALLOWED")
+SPORTS_ALLOWED = _env_set("SPORTS_ALLOWED")  # optional
 
 
-def _latest_update_iso(series: Iterable[str]) -> str:
-    try:
-        ts = pd.to_datetime(series, utc=True, errors="coerce")
-        mx = ts.max()
-        if pd.isna(mx):
-            return ""
-        return mx.strftime("%Y-%m-%dT%H:%M:%SZ")
-    except Exception:
-        return ""
+def _filter_allowlists(df: pd.DataFrame) -> pd.DataFrame:
+    mask = None
+    if BOOKS_ALLOWED:
+        mask = df["book_key"].isin(BOOKS_ALLOWED)
+    if SPORTS_ALLOWED:
+        m = df["sport_key"].isin(SPORTS_ALLOWED)
+        mask = m if mask is None else mask & m
+    return df if mask is None else df[mask].copy()
+
+
+def _iso_or_blank(ts: pd.Series) -> pd.Series:
+    # Formats per-group max timestamps; groups with no parseable update become "".
+    return ts.dt.strftime("%Y-%m-%dT%H:%M:%SZ").fillna("")
 
 
 def build_consensus() -> pd.DataFrame:
     if not os.path.exists(RAW_PATH) or os.path.getsize(RAW_PATH) == 0:
         raise FileNotFoundError(f"Missing or empty file: {RAW_PATH}")
 
-    df = pd.read_csv(RAW_PATH)
+    # book_key is low-cardinality and only filtered/counted, so keep it as integer codes.
+    # (sport_key stays object: as a categorical groupby key it would need observed=True.)
+    df = pd.read_csv(RAW_PATH, dtype={"book_key": "category"})
     needed = {
         "event_id", "sport_key", "commence_time", "home_team", "away_team",
         "book_key", "book_title", "last_update", "market_key", "outcome_name", "price"
@@ -115,7 +108,7 @@ def build_consensus() -> pd.DataFrame:
     df = df[df["side"].isin(["home", "away"])].copy()
 
     # Convert American odds to implied probabilities
-    df["q"] = df["price"].map(_american_to_prob)
+    df["q"] = _american_to_prob(df["price"])
 
     # Drop rows with invalid probs
     df = df[pd.notna(df["q"]) & (df["q"] > 0) & (df["q"] < 1)].copy()
@@ -131,14 +124,21 @@ def build_consensus() -> pd.DataFrame:
     # We average probabilities by side; also collect books_used & num_books per event.
     group_keys = ["event_id", "sport_key", "commence_time", "home_team", "away_team"]
     # consensus by side
+    # Parse update stamps once for the whole frame (not once per group) and take the
+    # per-group max as a native datetime reduction. pivot_table below sorts its index,
+    # so the groupby's own key sort is skipped.
+    df["_last_update_ts"] = pd.to_datetime(
+        df["last_update"], utc=True, errors="coerce", format="ISO8601"
+    )
     side_mean = (
-        df.groupby(group_keys + ["side"])
+        df.groupby(group_keys + ["side"], sort=False)
           .agg(consensus_q=("q", "mean"),
                books_used=("book_key", lambda x: ",".join(sorted(set(x)))),
-               num_books=("book_key", lambda x: len(set(x))),
-               last_updated_utc=("last_update", _latest_update_iso))
+               num_books=("book_key", "nunique"),
+               last_updated_utc=("_last_update_ts", "max"))
           .reset_index()
     )
+    side_mean["last_updated_utc"] = _iso_or_blank(side_mean["last_updated_utc"])
 
     # pivot back to home/away columns
     pivot = side_mean.pivot_table(
@@ -178,8 +178,8 @@ def build_consensus() -> pd.DataFrame:
             out["last_updated_utc"] = pivot["last_updated_utc_away"]
 
     # Fair odds from consensus probabilities
-    out["consensus_home_fair_odds"] = out["consensus_home_q"].map(_prob_to_american)
-    out["consensus_away_fair_odds"] = out["consensus_away_q"].map(_prob_to_american)
+    out["consensus_home_fair_odds"] = _prob_to_american(out["consensus_home_q"])
+    out["consensus_away_fair_odds"] = _prob_to_american(out["consensus_away_q"])
 
     # Order/keep columns
     cols = [
@@ -195,10 +195,10 @@ def build_consensus() -> pd.DataFrame:
     return out
 
 
-def main():
-    os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
+def main(argv: list[str] | None = None):
+    # No CLI options; argv is accepted so callers can invoke every pipeline module alike.
     df = build_consensus()
-    df.to_csv(OUT_PATH, index=False)
+    write_baseline(df, OUT_PATH)
     print(f"Wrote {OUT_PATH} with {len(df)} rows")
 
 
@@ -10,7 +10,9 @@ def main():
     processed.mkdir(parents=True, exist_ok=True)
 
     df = pd.read_csv(raw / "toy_games.csv")
-    df['market_implied_q_novig'] = df['price_home_decimal'].apply(lambda d: (1.0/d) / ((1.0/d) + (1 - (1.0/d))))
+    # Computed once here so the engine and backtest read it instead of re-deriving it.
+    q_vig = 1.0/df['price_home_decimal'].values
+    df['market_implied_q_novig'] = q_vig / (q_vig + (1 - q_vig))
     feats = df[[
         'game_id','home_rating','away_rating','rest_diff','travel_miles','weather_wind',
         'market_implied_q_novig','home_win','price_home_american','price_home_decimal','book'
@@ -1,5 +1,5 @@
 
-import os, argparse, yaml
+import argparse, yaml
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -8,7 +8,6 @@ from joblib import dump
 
 def load_config(path):
     with open(path, 'r') as f:
-        import yaml
         return yaml.safe_load(f)
 
 def main():
@@ -1,5 +1,5 @@
 
-import os, argparse, yaml
+import argparse, yaml
 import pandas as pd
 import numpy as np
 from pathlib import Path